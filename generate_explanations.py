@@ -53,8 +53,9 @@ class ExplanationGenerator:
     
     def _save_explanations(self):
         """Save explanations to file"""
+        # Serialize first and write once; json.dump would issue a write per token
         with open(self.output_file, 'w') as f:
-            json.dump(self.explanations, f, indent=2)
+            f.write(json.dumps(self.explanations, indent=2))
     
     async def generate_for_comic(self, comic: Dict, models: List[str]) -> Dict[str, str]:
         """Generate explanations for a single comic using specified models"""
@@ -172,20 +173,25 @@ async def main():
     
     generator = ExplanationGenerator()
     
-    if args.stats:
-        stats = generator.get_statistics()
-        print("\nExplanation Generation Statistics:")
-        print(f"Total comics: {stats['total_comics']}")
-        print(f"Comics with explanations: {stats['comics_with_explanations']}")
-        print("\nExplanations per model:")
-        for model, count in stats['model_counts'].items():
-            print(f"  {model}: {count}")
-    else:
-        await generator.generate_all_explanations(
-            models=args.models,
-            limit=args.limit,
-            skip_existing=not args.no_skip
-        )
+    try:
+        if args.stats:
+            stats = generator.get_statistics()
+            print("\nExplanation Generation Statistics:")
+            print(f"Total comics: {stats['total_comics']}")
+            print(f"Comics with explanations: {stats['comics_with_explanations']}")
+            print("\nExplanations per model:")
+            for model, count in stats['model_counts'].items():
+                print(f"  {model}: {count}")
+        else:
+            await generator.generate_all_explanations(
+                models=args.models,
+                limit=args.limit,
+                skip_existing=not args.no_skip
+            )
+    finally:
+        # Close pooled provider connections while the event loop is still running,
+        # including when generation fails or is interrupted
+        await generator.runner.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+JSON helpers shared by the benchmark scripts.
+Uses orjson when it is installed and falls back to the stdlib json module.
+"""
+import os
+import json
+import mmap
+
+# orjson is imported lazily in each helper so importing this module stays cheap
+
+def json_loads(data: bytes):
+    """Parse JSON with orjson when it is installed, else the stdlib parser"""
+    try:
+        import orjson
+    except ImportError:  # Optional: fall back to the stdlib parser
+        return json.loads(data)
+    return orjson.loads(data)
+
+def load_json_file(path: str):
+    """Parse a JSON file; with orjson the file is mapped and parsed in place instead of read into a copy"""
+    with open(path, 'rb') as f:
+        try:
+            import orjson
+        except ImportError:  # Optional: fall back to the stdlib parser
+            return json.load(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return orjson.loads(b'')  # An empty file can't be mapped; let orjson raise its usual error
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            return orjson.loads(view)
+
+def json_dumps(obj, indent: bool = True) -> bytes:
+    """Serialize obj as UTF-8 JSON bytes (indented by default), using orjson when it is installed"""
+    try:
+        import orjson
+    except ImportError:  # Optional: fall back to the stdlib encoder
+        if indent:
+            return json.dumps(obj, indent=2).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
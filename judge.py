@@ -4,17 +4,136 @@ Judge system for scoring AI explanations against ground truth.
 Uses a strong AI model to provide consistent scoring.
 """
 import os
+import re
 import json
 import asyncio
-import yaml
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
-from datetime import datetime
+import functools
+import hashlib
+import sqlite3
+import statistics
+import threading
+import weakref
+from typing import Dict, List, Optional, Any, Awaitable, Tuple
+from dataclasses import dataclass, asdict
+from pydantic import BaseModel, ValidationError
+from datetime import datetime, timezone
 import logging
-from model_runner import ModelRunner, ModelResponse
+from model_runner import ModelRunner, ModelResponse, encode_image_file, load_config
 
 logger = logging.getLogger(__name__)
 
+_UTC = timezone.utc
+
+# Patterns for pulling scores out of free-text judge responses
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+_SCORE_RES = {
+    field: re.compile(rf'"{field}"\s*:\s*([\d.]+)')
+    for field in ('accuracy_score', 'completeness_score', 'insight_score', 'clarity_score', 'overall_score')
+}
+_REASONING_RE = re.compile(r'"reasoning"\s*:\s*"(.*?)"(?:\s*[,}])', re.DOTALL)
+
+# Characters that matter when matching braces in JSON text
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text, ignoring braces inside strings"""
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = -1  # Position of a character escaped by a preceding backslash
+    # Jump straight between significant characters rather than stepping through every one
+    for match in _JSON_TOKEN_RE.finditer(text, start):
+        pos = match.start()
+        if pos == escaped:
+            continue
+        char = match.group()
+        if in_string:
+            if char == '\\':
+                escaped = pos + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    
+    return None
+
+_SCORE_FIELDS = ['accuracy_score', 'completeness_score', 'insight_score', 'clarity_score', 'overall_score', 'reasoning']
+
+# JSON schema for one set of scores, shared by the single and batched judge tools
+_SCORE_PROPERTIES = {
+    "accuracy_score": {
+        "type": "number",
+        "description": "Score 1-10 for how accurately the AI identifies what's happening",
+        "minimum": 1,
+        "maximum": 10
+    },
+    "completeness_score": {
+        "type": "number",
+        "description": "Score 1-10 for coverage of all important visual elements",
+        "minimum": 1,
+        "maximum": 10
+    },
+    "insight_score": {
+        "type": "number",
+        "description": "Score 1-10 for understanding the humor or message",
+        "minimum": 1,
+        "maximum": 10
+    },
+    "clarity_score": {
+        "type": "number",
+        "description": "Score 1-10 for how well-written the explanation is",
+        "minimum": 1,
+        "maximum": 10
+    },
+    "overall_score": {
+        "type": "number",
+        "description": "Weighted average: (accuracy * 0.4 + completeness * 0.25 + insight * 0.25 + clarity * 0.1)",
+        "minimum": 1,
+        "maximum": 10
+    },
+    "reasoning": {
+        "type": "string",
+        "description": "Detailed explanation of the scoring, highlighting strengths and weaknesses"
+    }
+}
+
+_SCORE_SCHEMA = {
+    "type": "object",
+    "properties": _SCORE_PROPERTIES,
+    "required": _SCORE_FIELDS
+}
+
+_BATCH_SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "scores": {
+            "type": "array",
+            "description": "One entry per explanation, in the order the explanations were given",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "explanation_number": {
+                        "type": "integer",
+                        "description": "Number of the explanation these scores are for"
+                    },
+                    **_SCORE_PROPERTIES
+                },
+                "required": ["explanation_number"] + _SCORE_FIELDS
+            }
+        }
+    },
+    "required": ["scores"]
+}
+
 @dataclass
 class JudgeScore:
     """Score from the judge with detailed breakdown"""
@@ -26,17 +145,140 @@ class JudgeScore:
     reasoning: str  # Judge's explanation of the score
     timestamp: str
     judge_model: str
+    
+    def to_result_dict(self) -> Dict[str, Any]:
+        """The fields recorded per model in benchmark results (everything but judge_model)"""
+        return {
+            'overall_score': self.overall_score,
+            'accuracy_score': self.accuracy_score,
+            'completeness_score': self.completeness_score,
+            'insight_score': self.insight_score,
+            'clarity_score': self.clarity_score,
+            'reasoning': self.reasoning,
+            'timestamp': self.timestamp
+        }
+
+class ScoreModel(BaseModel):
+    """Judge scores as returned by either the tool call or a parsed text response"""
+    accuracy_score: float
+    completeness_score: float
+    insight_score: float
+    clarity_score: float
+    overall_score: float
+    reasoning: str
+
+# AsyncAnthropic clients per event loop and API key. Sharing one client shares its keep-alive
+# connection pool; keying on the loop keeps pooled connections from outliving their loop.
+_anthropic_clients = weakref.WeakKeyDictionary()
+
+def _shared_async_anthropic(api_key: Optional[str]):
+    """Get the AsyncAnthropic client shared by every judge on the running event loop"""
+    clients = _anthropic_clients.setdefault(asyncio.get_running_loop(), {})
+    if api_key not in clients:
+        import anthropic
+        
+        clients[api_key] = anthropic.AsyncAnthropic(api_key=api_key)
+    return clients[api_key]
+
+async def _close_shared_async_anthropic():
+    """Close the AsyncAnthropic clients shared on the running event loop"""
+    clients = _anthropic_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+@functools.lru_cache(maxsize=32)
+def _file_sha256(comic_image_path: str, mtime_ns: int, size: int) -> str:
+    """Hash one version of a file's bytes"""
+    with open(comic_image_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _image_sha256(comic_image_path: str) -> str:
+    """Hash a comic image's bytes so cached verdicts follow the image, not its path.
+    The hash is recomputed if the file changes on disk."""
+    st = os.stat(comic_image_path)
+    return _file_sha256(comic_image_path, st.st_mtime_ns, st.st_size)
+
+class JudgeCache:
+    """Persistent sqlite store of judge verdicts keyed on a hash of the judge inputs"""
+    
+    def __init__(self, path: str = ".judge_cache.sqlite"):
+        # The cache may be opened on a worker thread and used from the event loop,
+        # so the connection isn't bound to its creating thread; the lock serializes use
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, score TEXT NOT NULL)")
+            self.conn.commit()
+    
+    @staticmethod
+    def make_key(comic_image_path: str, ground_truth: str, model_explanation: str, judge_model: str) -> str:
+        """Combine per-input digests into one key"""
+        digest = hashlib.sha256(_image_sha256(comic_image_path).encode('ascii'))
+        for part in (ground_truth, model_explanation, judge_model):
+            digest.update(hashlib.sha256(part.encode('utf-8')).digest())
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[JudgeScore]:
+        """Return the cached verdict for key, if any"""
+        with self._lock:
+            row = self.conn.execute("SELECT score FROM verdicts WHERE key = ?", (key,)).fetchone()
+        return JudgeScore(**json.loads(row[0])) if row else None
+    
+    def put(self, key: str, score: JudgeScore):
+        """Store a verdict"""
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO verdicts (key, score) VALUES (?, ?)",
+                              (key, json.dumps(asdict(score))))
+            self.conn.commit()
 
 class ComicExplanationJudge:
     """Judge for scoring comic explanations"""
     
-    def __init__(self, config_path: str = "models_config.yaml"):
-        """Initialize judge with configuration"""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self,
+                 config_path: str = "models_config.yaml",
+                 judge_model_id: Optional[str] = None,
+                 runner: Optional[ModelRunner] = None,
+                 max_concurrency: Optional[int] = None):
+        """Initialize judge with configuration.
+        
+        judge_model_id overrides the configured judge_model, and runner lets judges share
+        one ModelRunner. Passing judge_model_id also disables ensemble judging.
+        max_concurrency overrides the configured cap on in-flight judge calls.
+        """
+        self.config_path = config_path
+        # A judge sharing a runner shares its parsed config too
+        self.config = runner.config if runner is not None else load_config(config_path)
+        
+        self.judge_model_id = judge_model_id or self.config.get('judge_model', 'claude-3-opus')
+        self.runner = runner or ModelRunner(config_path, config=self.config)
+        
+        # With judge_models configured, every explanation is scored by each of them
+        self.ensemble_model_ids = (self.config.get('judge_models') or []) if judge_model_id is None else []
+        self._ensemble = None
+        
+        # Judge settings never change per instance, so resolve them once
+        judge_config = self.config['models'][self.judge_model_id]
+        self._judge_model = judge_config['model']
+        self._judge_max_tokens = judge_config['max_tokens']
+        self._judge_temperature = judge_config['temperature']
+        self._judge_api_key = os.getenv(judge_config['api_key_env'])
+        # Claude 3.7 Sonnet needs a beta flag for token-efficient tool use; Claude 4 models do it by default
+        self._judge_extra_headers = None
+        if self._judge_model.startswith('claude-3-7-sonnet'):
+            self._judge_extra_headers = {"anthropic-beta": "token-efficient-tools-2025-02-19"}
+        # Anthropic judges use tool calling for structured scores; others are parsed from text
+        self._use_structured = self.judge_model_id.startswith('claude') and judge_config['provider'] == 'anthropic'
         
-        self.judge_model_id = self.config.get('judge_model', 'claude-3-opus')
-        self.runner = ModelRunner(config_path)
+        # The semaphore caps in-flight judge calls across all comics (and all ensemble judges)
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv('JUDGE_MAX_CONCURRENCY', self.config.get('max_judge_concurrency', 16)))
+        self._judge_semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        # Verdicts are only reusable when the judge is deterministic, unless judge_cache opts in
+        self.cache = None
+        if self.config.get('judge_cache', self._judge_temperature == 0):
+            self.cache = JudgeCache(self.config.get('judge_cache_path', '.judge_cache.sqlite'))
         
         # Create the judge prompt template
         self.judge_prompt_template = """You are an expert judge evaluating AI explanations of comic strips. Your task is to score an AI model's explanation against a high-quality ground truth explanation.
@@ -82,15 +324,34 @@ The overall_score should be a weighted average: (accuracy * 0.4 + completeness *
                               model_explanation: str,
                               model_name: str = "unknown") -> JudgeScore:
         """Judge a single explanation against ground truth"""
+        # Trivial cases have a known score, so skip the judge call entirely
+        trivial = self._trivial_score(ground_truth, model_explanation)
+        if trivial is not None:
+            return trivial
+        
+        if self.ensemble_model_ids:
+            return await self.judge_ensemble(comic_image_path, ground_truth, model_explanation, model_name)
+        
+        cache_key = self._cache_key(comic_image_path, ground_truth, model_explanation)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached:
+                return cached
         
         # Check if we're using an Anthropic model and can use structured output
-        if self.judge_model_id.startswith('claude') and self.config['models'][self.judge_model_id]['provider'] == 'anthropic':
-            return await self._judge_with_anthropic_structured(
+        if self._use_structured:
+            score = await self._judge_with_anthropic_structured(
                 comic_image_path, ground_truth, model_explanation, model_name
             )
+        else:
+            # Otherwise use the standard approach with text parsing
+            score = await self._judge_with_text_parsing(comic_image_path, ground_truth, model_explanation, model_name)
+        
+        # Don't cache failures; they should be retried next run
+        if cache_key and not score.reasoning.startswith("Error: "):
+            self.cache.put(cache_key, score)
         
-        # Otherwise use the standard approach with text parsing
-        return await self._judge_with_text_parsing(comic_image_path, ground_truth, model_explanation, model_name)
+        return score
     
     async def _judge_with_anthropic_structured(self,
                                               comic_image_path: str,
@@ -99,25 +360,14 @@ The overall_score should be a weighted average: (accuracy * 0.4 + completeness *
                                               model_name: str) -> JudgeScore:
         """Use Anthropic's structured output for judging"""
         try:
-            import anthropic
-            import base64
+            client = self._get_anthropic_client()
             
-            # Get API key from config
-            api_key = os.getenv(self.config['models'][self.judge_model_id]['api_key_env'])
-            client = anthropic.Anthropic(api_key=api_key)
-            
-            # Read and encode image
-            with open(comic_image_path, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
-            
-            media_type = "image/png" if comic_image_path.endswith('.png') else "image/jpeg"
-            
-            # Create prompt
-            prompt = f"""You are an expert judge evaluating AI explanations of comic strips. Your task is to score an AI model's explanation against a high-quality ground truth explanation.
-
-**Ground Truth Explanation**: {ground_truth}
+            # Create prompt, split so everything shared by a comic's judge calls comes first
+            shared_prompt = f"""You are an expert judge evaluating AI explanations of comic strips. Your task is to score an AI model's explanation against a high-quality ground truth explanation.
 
-**AI Model Explanation**: {model_explanation}
+**Ground Truth Explanation**: {ground_truth}"""
+            
+            prompt = f"""**AI Model Explanation**: {model_explanation}
 
 Evaluate the AI explanation on these criteria:
 1. **Accuracy** (weight 40%): Does it correctly identify what's happening?
@@ -128,20 +378,20 @@ Evaluate the AI explanation on these criteria:
 The AI explanation doesn't need to be identical to ground truth, just accurate and comprehensive."""
             
             # Use tool/function calling for structured output
-            message = client.messages.create(
-                model=self.config['models'][self.judge_model_id]['model'],
-                max_tokens=self.config['models'][self.judge_model_id]['max_tokens'],
-                temperature=self.config['models'][self.judge_model_id]['temperature'],
+            message = await self._create_message_with_retry(
+                client,
+                model=self._judge_model,
+                max_tokens=self._judge_max_tokens,
+                temperature=self._judge_temperature,
                 messages=[{
                     "role": "user",
                     "content": [
+                        await self._image_block(comic_image_path),
                         {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": media_type,
-                                "data": image_data
-                            }
+                            "type": "text",
+                            "text": shared_prompt,
+                            # Cache the tools, image and ground truth for the comic's other judge calls
+                            "cache_control": {"type": "ephemeral"}
                         },
                         {
                             "type": "text",
@@ -152,46 +402,7 @@ The AI explanation doesn't need to be identical to ground truth, just accurate a
                 tools=[{
                     "name": "score_explanation",
                     "description": "Score an AI explanation of a comic against ground truth",
-                    "input_schema": {
-                        "type": "object",
-                        "properties": {
-                            "accuracy_score": {
-                                "type": "number",
-                                "description": "Score 1-10 for how accurately the AI identifies what's happening",
-                                "minimum": 1,
-                                "maximum": 10
-                            },
-                            "completeness_score": {
-                                "type": "number",
-                                "description": "Score 1-10 for coverage of all important visual elements",
-                                "minimum": 1,
-                                "maximum": 10
-                            },
-                            "insight_score": {
-                                "type": "number",
-                                "description": "Score 1-10 for understanding the humor or message",
-                                "minimum": 1,
-                                "maximum": 10
-                            },
-                            "clarity_score": {
-                                "type": "number",
-                                "description": "Score 1-10 for how well-written the explanation is",
-                                "minimum": 1,
-                                "maximum": 10
-                            },
-                            "overall_score": {
-                                "type": "number",
-                                "description": "Weighted average: (accuracy * 0.4 + completeness * 0.25 + insight * 0.25 + clarity * 0.1)",
-                                "minimum": 1,
-                                "maximum": 10
-                            },
-                            "reasoning": {
-                                "type": "string",
-                                "description": "Detailed explanation of the scoring, highlighting strengths and weaknesses"
-                            }
-                        },
-                        "required": ["accuracy_score", "completeness_score", "insight_score", "clarity_score", "overall_score", "reasoning"]
-                    }
+                    "input_schema": _SCORE_SCHEMA
                 }],
                 tool_choice={"type": "tool", "name": "score_explanation"}
             )
@@ -208,24 +419,145 @@ The AI explanation doesn't need to be identical to ground truth, just accurate a
                 return self._create_error_score("No structured output from judge")
             
             # The input should be our scores
-            scores = tool_use.input
-            
-            return JudgeScore(
-                overall_score=float(scores['overall_score']),
-                accuracy_score=float(scores['accuracy_score']),
-                completeness_score=float(scores['completeness_score']),
-                insight_score=float(scores['insight_score']),
-                clarity_score=float(scores['clarity_score']),
-                reasoning=scores['reasoning'],
-                timestamp=datetime.utcnow().isoformat(),
-                judge_model=self.judge_model_id
-            )
+            return self._score_from_tool_input(tool_use.input)
             
         except Exception as e:
             logger.error(f"Error with Anthropic structured output: {e}")
             # Fall back to text parsing approach
             return await self._judge_with_text_parsing(comic_image_path, ground_truth, model_explanation, model_name)
     
+    def _trivial_score(self, ground_truth: str, model_explanation: str) -> Optional[JudgeScore]:
+        """Score for an empty explanation or an exact copy of the ground truth, else None"""
+        explanation_text = (model_explanation or '').strip()
+        if not explanation_text:
+            return self._create_error_score("Empty explanation")
+        if explanation_text == ground_truth.strip():
+            return JudgeScore(
+                overall_score=10.0,
+                accuracy_score=10.0,
+                completeness_score=10.0,
+                insight_score=10.0,
+                clarity_score=10.0,
+                reasoning="Exact match with ground truth",
+                timestamp=datetime.now(_UTC).isoformat(),
+                judge_model=self.judge_label
+            )
+        return None
+    
+    def _cache_key(self, comic_image_path: str, ground_truth: str, model_explanation: str) -> Optional[str]:
+        """Key for this judge's cached verdict on an explanation, or None when caching is off"""
+        if self.cache is None:
+            return None
+        # Key on the versioned model too, so repointing an alias invalidates old verdicts
+        judge_model = f"{self.judge_model_id}:{self._judge_model}"
+        return self.cache.make_key(comic_image_path, ground_truth, model_explanation, judge_model)
+    
+    @property
+    def judge_label(self) -> str:
+        """Name of the judge (or judges) behind this instance's scores"""
+        if self.ensemble_model_ids:
+            return "ensemble:" + "+".join(self.ensemble_model_ids)
+        return self.judge_model_id
+    
+    async def judge_ensemble(self,
+                             comic_image_path: str,
+                             ground_truth: str,
+                             model_explanation: str,
+                             model_name: str = "unknown") -> JudgeScore:
+        """Score an explanation with every ensemble judge concurrently and average the results"""
+        if self._ensemble is None:
+            self._ensemble = [ComicExplanationJudge(self.config_path, judge_model_id, self.runner)
+                              for judge_model_id in self.ensemble_model_ids]
+            for judge in self._ensemble:
+                judge._judge_semaphore = self._judge_semaphore
+        
+        # Judges run in parallel, so latency is the slowest judge rather than the sum
+        results = await asyncio.gather(
+            *(judge.judge_explanation(comic_image_path, ground_truth, model_explanation, model_name)
+              for judge in self._ensemble),
+            return_exceptions=True
+        )
+        
+        valid = []
+        for judge, result in zip(self._ensemble, results):
+            if isinstance(result, Exception):
+                logger.error(f"Ensemble judge {judge.judge_model_id} failed for {model_name}: {result}")
+            elif not result.reasoning.startswith("Error: "):
+                valid.append(result)
+        
+        if not valid:
+            return self._create_error_score("All ensemble judges failed")
+        
+        # Transpose once and average each criterion with fmean (fsum-based, so no float drift)
+        overall, accuracy, completeness, insight, clarity = map(statistics.fmean, zip(*(
+            (score.overall_score, score.accuracy_score, score.completeness_score,
+             score.insight_score, score.clarity_score)
+            for score in valid
+        )))
+        return JudgeScore(
+            overall_score=overall,
+            accuracy_score=accuracy,
+            completeness_score=completeness,
+            insight_score=insight,
+            clarity_score=clarity,
+            reasoning=" | ".join(f"[{score.judge_model}] {score.reasoning}" for score in valid),
+            timestamp=datetime.now(_UTC).isoformat(),
+            judge_model="+".join(score.judge_model for score in valid)
+        )
+    
+    async def _image_block(self, comic_image_path: str) -> Dict[str, Any]:
+        """Build the base64 image content block for an Anthropic judge request"""
+        # Shares the model runner's encoding cache, so the comic is read and encoded once,
+        # off the event loop
+        image_data, media_type = await asyncio.to_thread(encode_image_file, comic_image_path)
+        
+        return {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": media_type,
+                "data": image_data
+            }
+        }
+    
+    def _score_from_tool_input(self, scores: Dict[str, Any], timestamp: Optional[str] = None) -> JudgeScore:
+        """Validate a score_explanation tool input and convert it into a JudgeScore"""
+        return JudgeScore(
+            **ScoreModel.model_validate(scores).model_dump(),
+            timestamp=timestamp or datetime.now(_UTC).isoformat(),
+            judge_model=self.judge_model_id
+        )
+    
+    async def aclose(self):
+        """Close the judges' pooled Anthropic connections; call before the event loop shuts down.
+        The model runner is left open, since it may be shared."""
+        await _close_shared_async_anthropic()
+    
+    def _get_anthropic_client(self):
+        """Get the async Anthropic client, shared with other judges using the same key"""
+        return _shared_async_anthropic(self._judge_api_key)
+    
+    async def _create_message_with_retry(self, client, **kwargs):
+        """Create a judge message, backing off on rate limits and transient server errors"""
+        import anthropic
+        
+        retry_config = self.config.get('retry', {})
+        max_attempts = retry_config.get('max_attempts', 3)
+        delay = retry_config.get('initial_delay', 1)
+        backoff = retry_config.get('backoff_factor', 2)
+        
+        for attempt in range(max_attempts):
+            try:
+                async with self._judge_semaphore:
+                    return await client.messages.create(extra_headers=self._judge_extra_headers, **kwargs)
+            except (anthropic.RateLimitError, anthropic.InternalServerError, anthropic.APIConnectionError) as e:
+                if attempt == max_attempts - 1:
+                    raise
+                logger.warning(f"Judge attempt {attempt + 1} failed: {e}")
+                # Sleep outside the semaphore so backing-off calls don't hold slots
+                await asyncio.sleep(delay)
+                delay *= backoff
+    
     async def _judge_with_text_parsing(self,
                                      comic_image_path: str,
                                      ground_truth: str,
@@ -239,11 +571,12 @@ The AI explanation doesn't need to be identical to ground truth, just accurate a
         )
         
         try:
-            # Get judge response
+            # Get judge response, taking a judge slot per attempt so retries back off without one
             response = await self.runner.run_model(
                 self.judge_model_id, 
                 prompt, 
-                comic_image_path
+                comic_image_path,
+                slots=self._judge_semaphore
             )
             
             if response.error:
@@ -265,7 +598,7 @@ The AI explanation doesn't need to be identical to ground truth, just accurate a
                 insight_score=judge_output.get('insight_score', 0.0),
                 clarity_score=judge_output.get('clarity_score', 0.0),
                 reasoning=judge_output.get('reasoning', ''),
-                timestamp=datetime.utcnow().isoformat(),
+                timestamp=datetime.now(_UTC).isoformat(),
                 judge_model=self.judge_model_id
             )
             
@@ -277,81 +610,60 @@ The AI explanation doesn't need to be identical to ground truth, just accurate a
         """Parse JSON from judge response"""
         try:
             # First try to find JSON in a code block
-            import re
-            json_pattern = r'```json\s*(.*?)\s*```'
-            json_match = re.search(json_pattern, response_text, re.DOTALL)
+            json_match = _JSON_BLOCK_RE.search(response_text)
             
             if json_match:
                 json_str = json_match.group(1)
             else:
                 # Fallback: Try to find JSON object directly
-                start_idx = response_text.find('{')
-                end_idx = response_text.rfind('}') + 1
+                json_str = _extract_json_object(response_text)
                 
-                if start_idx == -1 or end_idx == 0:
+                if json_str is None:
                     logger.warning("No JSON found in judge response")
                     return None
-                
-                json_str = response_text[start_idx:end_idx]
-            
-            # Parse the JSON
-            result = json.loads(json_str)
-            
-            # Validate required fields
-            required_fields = ['accuracy_score', 'completeness_score', 'insight_score', 'clarity_score', 'overall_score', 'reasoning']
-            for field in required_fields:
-                if field not in result:
-                    logger.warning(f"Missing field {field} in judge response")
-                    return None
-            
-            # Ensure scores are floats
-            for field in ['accuracy_score', 'completeness_score', 'insight_score', 'clarity_score', 'overall_score']:
-                if field in result:
-                    result[field] = float(result[field])
-            
-            return result
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
-            logger.error(f"JSON string that failed: {json_str[:200]}...")
             
-            # Try to extract scores using regex as fallback
+            # Parse and validate in one step, without building an intermediate dict
             try:
-                scores = {}
-                score_patterns = {
-                    'accuracy_score': r'"accuracy_score"\s*:\s*([\d.]+)',
-                    'completeness_score': r'"completeness_score"\s*:\s*([\d.]+)',
-                    'insight_score': r'"insight_score"\s*:\s*([\d.]+)',
-                    'clarity_score': r'"clarity_score"\s*:\s*([\d.]+)',
-                    'overall_score': r'"overall_score"\s*:\s*([\d.]+)'
-                }
-                
-                for field, pattern in score_patterns.items():
-                    match = re.search(pattern, response_text)
-                    if match:
-                        scores[field] = float(match.group(1))
-                
-                # Extract reasoning (may contain newlines)
-                reasoning_pattern = r'"reasoning"\s*:\s*"(.*?)"(?:\s*[,}])'
-                reasoning_match = re.search(reasoning_pattern, response_text, re.DOTALL)
-                if reasoning_match:
-                    scores['reasoning'] = reasoning_match.group(1)
-                else:
-                    scores['reasoning'] = "Failed to extract reasoning"
-                
-                # Check if we got all required fields
-                if all(field in scores for field in required_fields):
-                    logger.info("Successfully extracted scores using regex fallback")
-                    return scores
+                return ScoreModel.model_validate_json(json_str).model_dump()
+            except ValidationError as e:
+                if all(error['type'] != 'json_invalid' for error in e.errors()):
+                    logger.warning(f"Invalid scores in judge response: {e}")
+                    return None
                 
-            except Exception as e2:
-                logger.error(f"Regex fallback also failed: {e2}")
+                logger.error(f"JSON decode error: {e}")
+                logger.error(f"JSON string that failed: {json_str[:200]}...")
+                return self._parse_scores_with_regex(response_text)
             
-            return None
         except Exception as e:
             logger.error(f"Error parsing judge response: {e}")
             return None
     
+    def _parse_scores_with_regex(self, response_text: str) -> Optional[Dict]:
+        """Extract scores field by field from a response that isn't valid JSON"""
+        try:
+            scores = {}
+            for field, pattern in _SCORE_RES.items():
+                match = pattern.search(response_text)
+                if match:
+                    scores[field] = float(match.group(1))
+            
+            # Extract reasoning (may contain newlines)
+            reasoning_match = _REASONING_RE.search(response_text)
+            if reasoning_match:
+                scores['reasoning'] = reasoning_match.group(1)
+            else:
+                scores['reasoning'] = "Failed to extract reasoning"
+            
+            # Check if we got all required fields
+            if all(field in scores for field in _SCORE_FIELDS):
+                logger.info("Successfully extracted scores using regex fallback")
+                return scores
+            
+        except Exception as e:
+            logger.error(f"Regex fallback also failed: {e}")
+        
+        return None
+    
     def _create_error_score(self, error_message: str) -> JudgeScore:
         """Create a score object for errors"""
         return JudgeScore(
@@ -361,32 +673,207 @@ The AI explanation doesn't need to be identical to ground truth, just accurate a
             insight_score=0.0,
             clarity_score=0.0,
             reasoning=f"Error: {error_message}",
-            timestamp=datetime.utcnow().isoformat(),
-            judge_model=self.judge_model_id
+            timestamp=datetime.now(_UTC).isoformat(),
+            judge_model=self.judge_label
         )
 
+    async def judge_explanation_batch(self,
+                                      comic_image_path: str,
+                                      ground_truth: str,
+                                      explanations: Dict[str, str]) -> Dict[str, JudgeScore]:
+        """Judge several explanations of the same comic with a single judge call.
+        
+        Only the Anthropic structured path supports batching; other judges, and any
+        explanation the batched call fails to score, are judged one at a time.
+        """
+        # Only explanations without a known score or cached verdict are sent to the judge
+        results = {}
+        cache_keys = {}
+        for model_name, model_explanation in explanations.items():
+            trivial = self._trivial_score(ground_truth, model_explanation)
+            if trivial is not None:
+                results[model_name] = trivial
+                continue
+            cache_key = self._cache_key(comic_image_path, ground_truth, model_explanation)
+            cached = self.cache.get(cache_key) if cache_key else None
+            if cached:
+                results[model_name] = cached
+            elif cache_key:
+                cache_keys[model_name] = cache_key
+        
+        uncached = {model_name: model_explanation for model_name, model_explanation in explanations.items()
+                    if model_name not in results}
+        if self._use_structured and uncached:
+            batch_results = await self._judge_batch_with_anthropic_structured(comic_image_path, ground_truth, uncached)
+            for model_name, score in batch_results.items():
+                if model_name in cache_keys:
+                    self.cache.put(cache_keys[model_name], score)
+            results.update(batch_results)
+        
+        missing = [model_name for model_name in explanations if model_name not in results]
+        if missing:
+            results.update(await self._judge_each(
+                comic_image_path, ground_truth, {model_name: explanations[model_name] for model_name in missing}
+            ))
+        
+        return {model_name: results[model_name] for model_name in explanations}
+    
+    async def _judge_batch_with_anthropic_structured(self,
+                                                     comic_image_path: str,
+                                                     ground_truth: str,
+                                                     explanations: Dict[str, str]) -> Dict[str, JudgeScore]:
+        """Score a numbered list of explanations in one structured Anthropic call"""
+        model_names = list(explanations)
+        
+        try:
+            client = self._get_anthropic_client()
+            
+            # Explanations are numbered rather than named so the judge can't favour a model
+            numbered = "\n\n".join(
+                f"**AI Model Explanation {number}**: {explanations[model_name]}"
+                for number, model_name in enumerate(model_names, 1)
+            )
+            
+            prompt = f"""You are an expert judge evaluating AI explanations of comic strips. Your task is to score each of {len(model_names)} AI model explanations independently against a high-quality ground truth explanation.
+
+**Ground Truth Explanation**: {ground_truth}
+
+{numbered}
+
+Evaluate each AI explanation on these criteria:
+1. **Accuracy** (weight 40%): Does it correctly identify what's happening?
+2. **Completeness** (weight 25%): Does it cover all important visual elements?
+3. **Insight** (weight 25%): Does it understand the humor or message?
+4. **Clarity** (weight 10%): Is it well-written and easy to understand?
+
+An AI explanation doesn't need to be identical to ground truth, just accurate and comprehensive. Score every explanation on its own merits, not relative to the others."""
+            
+            message = await self._create_message_with_retry(
+                client,
+                model=self._judge_model,
+                # Leave room for one set of scores per explanation
+                max_tokens=self._judge_max_tokens * len(model_names),
+                temperature=self._judge_temperature,
+                messages=[{
+                    "role": "user",
+                    "content": [
+                        # Batches of the same comic share the tools and image prefix
+                        {**await self._image_block(comic_image_path), "cache_control": {"type": "ephemeral"}},
+                        {
+                            "type": "text",
+                            "text": prompt
+                        }
+                    ]
+                }],
+                tools=[{
+                    "name": "score_explanations",
+                    "description": "Score each AI explanation of a comic against ground truth",
+                    "input_schema": _BATCH_SCORE_SCHEMA
+                }],
+                tool_choice={"type": "tool", "name": "score_explanations"}
+            )
+            
+            tool_use = next((content for content in message.content
+                             if content.type == 'tool_use' and content.name == 'score_explanations'), None)
+            if not tool_use:
+                logger.error("No tool use found in batched Anthropic response")
+                return {}
+            
+            # Every score from one call shares that call's timestamp
+            timestamp = datetime.now(_UTC).isoformat()
+            results = {}
+            for entry in tool_use.input.get('scores', []):
+                try:
+                    model_name = model_names[int(entry['explanation_number']) - 1]
+                    results[model_name] = self._score_from_tool_input(entry, timestamp)
+                except (KeyError, IndexError, TypeError, ValueError) as e:
+                    logger.warning(f"Skipping malformed batched score entry: {e}")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error with batched Anthropic structured output: {e}")
+            return {}
+    
     async def judge_multiple_explanations(self, 
                                         comic_image_path: str,
                                         ground_truth: str,
                                         explanations: Dict[str, str]) -> Dict[str, JudgeScore]:
-        """Judge multiple explanations for the same comic"""
-        tasks = []
+        """Judge multiple explanations for the same comic concurrently"""
+        batch_size = self.config.get('judge_batch_size', 1)
+        # Ensembles score each explanation with several judges, which batching doesn't support
+        if batch_size <= 1 or self.ensemble_model_ids:
+            return await self._judge_each(comic_image_path, ground_truth, explanations)
         
-        for model_name, explanation in explanations.items():
-            task = self.judge_explanation(
-                comic_image_path, 
-                ground_truth, 
-                explanation, 
-                model_name
+        # Pack explanations into groups of batch_size, one judge call per group
+        model_names = list(explanations)
+        batches = await asyncio.gather(*(
+            self.judge_explanation_batch(
+                comic_image_path,
+                ground_truth,
+                {model_name: explanations[model_name] for model_name in model_names[i:i + batch_size]}
             )
-            tasks.append((model_name, task))
+            for i in range(0, len(model_names), batch_size)
+        ))
+        
+        results = {}
+        for batch in batches:
+            results.update(batch)
+        return results
+    
+    async def _judge_each(self,
+                          comic_image_path: str,
+                          ground_truth: str,
+                          explanations: Dict[str, str]) -> Dict[str, JudgeScore]:
+        """Judge each explanation with its own concurrent judge call"""
+        model_names = list(explanations)
+        
+        # Run all judge calls at once so total latency is the slowest call, not the sum
+        scores = await asyncio.gather(
+            *(self.judge_explanation(comic_image_path, ground_truth, explanations[model_name], model_name)
+              for model_name in model_names),
+            return_exceptions=True
+        )
         
         results = {}
-        for model_name, task in tasks:
-            score = await task
+        for model_name, score in zip(model_names, scores):
+            if isinstance(score, Exception):
+                # Don't let one failed call discard the rest of the batch
+                logger.error(f"Error judging explanation for {model_name}: {score}")
+                score = self._create_error_score(str(score))
             results[model_name] = score
         
         return results
+    
+    async def judge_when_ready(self,
+                               comic_image_path: str,
+                               ground_truth: str,
+                               explanation_task: Awaitable[str],
+                               model_name: str = "unknown") -> JudgeScore:
+        """Wait for an explanation to finish generating, then judge it immediately"""
+        model_explanation = await explanation_task
+        
+        try:
+            return await self.judge_explanation(comic_image_path, ground_truth, model_explanation, model_name)
+        except Exception as e:
+            logger.error(f"Error judging explanation for {model_name}: {e}")
+            return self._create_error_score(str(e))
+    
+    def judge_interleaved(self,
+                          comic_image_path: str,
+                          ground_truth: str,
+                          explanation_tasks: Dict[str, Awaitable[str]]) -> Dict[str, "asyncio.Task[JudgeScore]"]:
+        """Start one judge task per pending explanation.
+        
+        Each task fires its judge call as soon as its explanation is ready, so judging
+        overlaps generation from slower models. The caller gathers the returned tasks.
+        A task raises only if its explanation task raised.
+        """
+        return {
+            model_name: asyncio.create_task(
+                self.judge_when_ready(comic_image_path, ground_truth, explanation_task, model_name)
+            )
+            for model_name, explanation_task in explanation_tasks.items()
+        }
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -418,5 +905,8 @@ if __name__ == "__main__":
                 print(f"  Reasoning: {score.reasoning[:100]}...")
         else:
             print(f"Test comic not found: {comic_path}")
+        
+        await judge.aclose()
+        await judge.runner.aclose()
     
     asyncio.run(test_judge())
\ No newline at end of file
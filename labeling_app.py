@@ -5,47 +5,274 @@ Provides a UI to review AI-generated explanations and select the best one.
 """
 import os
 import json
+import atexit
+import logging
+import bisect
+import glob
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+
+from json_utils import json_loads, json_dumps
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
+
+_UTC = timezone.utc
+
+_JSON_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+def _index_json_object(data: bytes) -> Dict[str, Tuple[int, int]]:
+    """Map each top-level key of a JSON object to the byte span of its value"""
+    # Latin-1 gives one character per byte, so string indices double as byte offsets.
+    # UTF-8 multi-byte sequences never contain ASCII, so JSON structure scans correctly.
+    text = data.decode('latin-1')
+    scan = json.JSONDecoder().raw_decode
+    skip = _JSON_WHITESPACE_RE.match
+    
+    pos = skip(text).end()
+    if text[pos:pos + 1] != '{':
+        raise ValueError("Expected a JSON object")
+    pos = skip(text, pos + 1).end()
+    
+    index = {}
+    while text[pos:pos + 1] != '}':
+        key_start = pos
+        _, pos = scan(text, pos)
+        # Decode the key from the original bytes so non-ASCII keys come out right
+        key = json.loads(data[key_start:pos])
+        pos = skip(text, pos).end()
+        if text[pos:pos + 1] != ':':
+            raise ValueError(f"Expected ':' at byte {pos}")
+        
+        value_start = skip(text, pos + 1).end()
+        _, value_end = scan(text, value_start)
+        index[key] = (value_start, value_end)
+        
+        pos = skip(text, value_end).end()
+        if text[pos:pos + 1] == ',':
+            pos = skip(text, pos + 1).end()
+        elif text[pos:pos + 1] != '}':
+            raise ValueError(f"Expected ',' or '}}' at byte {pos}")
+    
+    return index
+
+class _LazyJsonObject(Mapping):
+    """Read-only view of a top-level JSON object that parses values on demand.
+    
+    Only key offsets are kept in memory; each lookup seeks to one value and parses it.
+    The file is re-indexed if it changes on disk (e.g. generate_explanations.py reruns).
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._stat = None
+        self._index = {}
+        self._refresh()
+    
+    def _refresh(self) -> Tuple[int, int]:
+        """Rebuild the offset index if the file changed since it was built, returning its (mtime, size)"""
+        st = os.stat(self.path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if stat_key != self._stat:
+            with open(self.path, 'rb') as f:
+                self._index = _index_json_object(f.read())
+            self._stat = stat_key
+        return stat_key
+    
+    def __getitem__(self, key: str):
+        self._refresh()
+        start, end = self._index[key]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return json_loads(f.read(end - start))
+    
+    def __contains__(self, key) -> bool:
+        self._refresh()
+        return key in self._index
+    
+    def __iter__(self):
+        self._refresh()
+        return iter(self._index)
+    
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._index)
 
 class LabelingApp:
+    # Labels journaled since the last snapshot before the snapshot is rewritten
+    COMPACT_EVERY = 25
+    
     def __init__(self, 
                  explanations_file: str = "ai_explanations.json",
                  ground_truth_file: str = "ground_truth_labels.json"):
         self.explanations_file = explanations_file
         self.ground_truth_file = ground_truth_file
+        # Each label is appended here first; the JSON snapshot is only rewritten on compaction
+        self.journal_file = os.path.splitext(ground_truth_file)[0] + '.jsonl'
+        self._journal = None
+        self._journaled = 0
+        # Requests are served on multiple threads; the lock guards label state and journal
+        # files, and snapshots are written by one background thread, in order. It is reentrant
+        # so a snapshot written on a request thread can take it again to drop its journals
+        self._lock = threading.RLock()
+        self._snapshot_writer = ThreadPoolExecutor(max_workers=1)
+        self._pending_snapshot = None
+        # Rotated journals already handed to a snapshot, which removes them once written
+        self._claimed_journals = set()
         
-        # Load explanations
+        # Index explanations; each comic's entry is only parsed when it is viewed
         if os.path.exists(explanations_file):
-            with open(explanations_file, 'r') as f:
-                self.explanations = json.load(f)
+            self.explanations = _LazyJsonObject(explanations_file)
         else:
             self.explanations = {}
         
         # Load existing ground truth
         if os.path.exists(ground_truth_file):
-            with open(ground_truth_file, 'r') as f:
-                self.ground_truth = json.load(f)
+            with open(ground_truth_file, 'rb') as f:
+                self.ground_truth = json_loads(f.read())
         else:
             self.ground_truth = {}
         
+        # Recover labels saved after the last snapshot, then fold them into it so
+        # readers of the snapshot (run_benchmark.py) see them
+        if self._replay_journal():
+            self.save_ground_truth()
+        atexit.register(self.compact)
+        
+        self._explanations_stat = None
+        self._index_comics()
+    
+    def _index_comics(self):
+        """Order comics as the explanations file lists them and find the unlabeled ones"""
+        if isinstance(self.explanations, _LazyJsonObject):
+            self._explanations_stat = self.explanations._refresh()
         self.comic_ids = list(self.explanations.keys())
+        self._id_to_pos = {comic_id: pos for pos, comic_id in enumerate(self.comic_ids)}
+        # Sorted positions of unlabeled comics, so the next one after any comic is a bisect away
+        self._unlabeled_positions = [pos for pos, comic_id in enumerate(self.comic_ids)
+                                     if comic_id not in self.ground_truth]
+    
+    def _sync_comics(self):
+        """Re-index comics if the explanations file changed on disk (lock held)"""
+        if (isinstance(self.explanations, _LazyJsonObject)
+                and self.explanations._refresh() != self._explanations_stat):
+            self._index_comics()
+    
+    def _rotated_journals(self) -> List[str]:
+        """Journals set aside for a snapshot that hasn't been written yet, oldest first"""
+        rotated = [path for path in glob.glob(glob.escape(self.journal_file) + '.*')
+                   if path.rsplit('.', 1)[1].isdigit()]
+        return sorted(rotated, key=lambda path: int(path.rsplit('.', 1)[1]))
+    
+    def _replay_journal(self) -> int:
+        """Apply journaled labels on top of the loaded snapshot, returning how many were applied"""
+        applied = 0
+        for path in self._rotated_journals() + [self.journal_file]:
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json_loads(line)
+                    except ValueError:
+                        # A crash mid-append can leave a truncated last line
+                        continue
+                    self.ground_truth[entry['comic_id']] = entry['label']
+                    applied += 1
+        return applied
+    
+    def _append_to_journal(self, comic_id: str, label: Dict):
+        """Durably append one label to the journal (lock held)"""
+        if self._journal is None:
+            self._journal = open(self.journal_file, 'ab')
+        
+        self._journal.write(json_dumps({'comic_id': comic_id, 'label': label}, indent=False) + b'\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journaled += 1
+    
+    def _rotate_journal(self):
+        """Set the live journal aside and copy the state it leads up to (lock held).
+        
+        Returns the copy and the rotated journals it supersedes; new labels go to a fresh journal.
+        """
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if os.path.exists(self.journal_file):
+            os.replace(self.journal_file, f"{self.journal_file}.{time.time_ns()}")
+        self._journaled = 0
+        
+        # A journal is left to the first snapshot that covers it, so queued snapshots don't
+        # both try to remove it
+        superseded = [path for path in self._rotated_journals() if path not in self._claimed_journals]
+        self._claimed_journals.update(superseded)
+        
+        # Labels are replaced, never mutated, so a shallow copy is a consistent snapshot
+        return dict(self.ground_truth), superseded
+    
+    def _write_snapshot(self, snapshot: Dict, superseded: List[str]):
+        """Atomically write a ground truth snapshot, then drop the journals it covers"""
+        tmp_file = self.ground_truth_file + '.tmp'
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(json_dumps(snapshot))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.ground_truth_file)
+        except BaseException:
+            # Hand the journals back so the next snapshot covers them
+            with self._lock:
+                self._claimed_journals.difference_update(superseded)
+            raise
+        
+        # Only remove journals once the snapshot is in place; replaying a stale one is harmless
+        with self._lock:
+            for path in superseded:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._claimed_journals.discard(path)
+    
+    @staticmethod
+    def _log_snapshot_failure(future):
+        """Log a background snapshot that failed; its labels stay journaled for the next one"""
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Failed to write ground truth snapshot", exc_info=future.exception())
+    
+    def compact(self):
+        """Fold any journaled labels into the snapshot"""
+        if self._journaled:
+            self.save_ground_truth()
     
     def save_ground_truth(self):
-        """Save ground truth to file"""
-        with open(self.ground_truth_file, 'w') as f:
-            json.dump(self.ground_truth, f, indent=2)
+        """Write the full ground truth snapshot now and clear the journals it supersedes"""
+        while True:
+            with self._lock:
+                # Snapshots are written in order, so once the latest queued one has landed, all have
+                pending = self._pending_snapshot
+                if pending is None or pending.done():
+                    self._pending_snapshot = None
+                    self._write_snapshot(*self._rotate_journal())
+                    return
+            # Let it land first so it can't overwrite this one; wait outside the lock,
+            # which the snapshot thread takes to drop its journals
+            wait([pending])
     
     def get_comic_data(self, comic_id: str) -> Optional[Dict]:
         """Get comic data for labeling interface"""
-        if comic_id not in self.explanations:
+        try:
+            comic_data = self.explanations[comic_id].copy()
+        except KeyError:
             return None
         
-        comic_data = self.explanations[comic_id].copy()
-        
         # Add ground truth data if available
         if comic_id in self.ground_truth:
             comic_data.update(self.ground_truth[comic_id])
@@ -54,7 +281,9 @@ class LabelingApp:
     
     def save_label(self, comic_id: str, selected: str, custom_explanation: str = "") -> bool:
         """Save label for a comic"""
-        if comic_id not in self.explanations:
+        try:
+            comic = self.explanations[comic_id]
+        except KeyError:
             return False
         
         # Get the actual explanation text
@@ -63,23 +292,39 @@ class LabelingApp:
             source_model = None
         else:
             # Get the explanation from the selected model
-            explanations = self.explanations[comic_id].get('explanations', {})
+            explanations = comic.get('explanations', {})
             explanation_text = explanations.get(selected, '')
             source_model = selected
         
-        self.ground_truth[comic_id] = {
+        label = {
             'explanation': explanation_text,
             'source_model': source_model,  # None if custom, model name if selected
             'is_custom': selected == 'custom',
             'labeled_by': 'human',
-            'labeled_at': datetime.utcnow().isoformat()
+            'labeled_at': datetime.now(_UTC).isoformat()
         }
         
-        self.save_ground_truth()
+        with self._lock:
+            self.ground_truth[comic_id] = label
+            
+            self._sync_comics()
+            pos = self._id_to_pos.get(comic_id)
+            if pos is not None:
+                i = bisect.bisect_left(self._unlabeled_positions, pos)
+                if i < len(self._unlabeled_positions) and self._unlabeled_positions[i] == pos:
+                    del self._unlabeled_positions[i]
+            
+            self._append_to_journal(comic_id, label)
+            if self._journaled >= self.COMPACT_EVERY:
+                # Serialize and write the snapshot off the request thread
+                self._pending_snapshot = self._snapshot_writer.submit(self._write_snapshot, *self._rotate_journal())
+                self._pending_snapshot.add_done_callback(self._log_snapshot_failure)
         return True
     
     def get_progress(self) -> Dict:
         """Get labeling progress statistics"""
+        with self._lock:
+            self._sync_comics()
         total = len(self.comic_ids)
         labeled = len(self.ground_truth)
         return {
@@ -90,34 +335,46 @@ class LabelingApp:
         }
     
     def get_next_unlabeled(self, current_id: Optional[str] = None) -> Optional[str]:
-        """Get next unlabeled comic ID"""
-        if current_id:
-            try:
-                current_index = self.comic_ids.index(current_id)
-                start_index = current_index + 1
-            except ValueError:
-                start_index = 0
-        else:
-            start_index = 0
-        
-        # Look for next unlabeled comic
-        for i in range(start_index, len(self.comic_ids)):
-            if self.comic_ids[i] not in self.ground_truth:
-                return self.comic_ids[i]
-        
-        # Wrap around to beginning
-        for i in range(0, start_index):
-            if self.comic_ids[i] not in self.ground_truth:
-                return self.comic_ids[i]
-        
-        return None
+        """Get next unlabeled comic ID after current_id, wrapping around to the start"""
+        with self._lock:
+            self._sync_comics()
+            # Unknown or missing current_id starts from the beginning
+            start_index = self._id_to_pos.get(current_id, -1) + 1
+            
+            if not self._unlabeled_positions:
+                return None
+            
+            # Look for next unlabeled comic
+            i = bisect.bisect_left(self._unlabeled_positions, start_index)
+            if i == len(self._unlabeled_positions):
+                # Wrap around to beginning
+                i = 0
+            return self.comic_ids[self._unlabeled_positions[i]]
+    
+    def get_position(self, comic_id: str) -> int:
+        """Get the 1-based position of a comic in the labeling order, or 0 if it is no longer listed"""
+        with self._lock:
+            self._sync_comics()
+            return self._id_to_pos.get(comic_id, -1) + 1
 
-# Global labeling app instance
-labeling_app = LabelingApp()
+# Global labeling app instance, created on the first request: loading it replays and clears
+# label journals, so importing this module (e.g. from tests) must not touch the files here
+_labeling_app = None
+_labeling_app_lock = threading.Lock()
+
+def get_labeling_app() -> LabelingApp:
+    """Return the global labeling app instance, creating it on first use"""
+    global _labeling_app
+    with _labeling_app_lock:
+        if _labeling_app is None:
+            _labeling_app = LabelingApp()
+        return _labeling_app
 
 @app.route('/')
 def index():
     """Main labeling interface"""
+    labeling_app = get_labeling_app()
+    
     # Get first unlabeled comic
     comic_id = request.args.get('comic_id')
     if not comic_id:
@@ -132,7 +389,7 @@ def index():
         return "Comic not found", 404
     
     progress = labeling_app.get_progress()
-    current_index = labeling_app.comic_ids.index(comic_id) + 1
+    current_index = labeling_app.get_position(comic_id)
     
     return render_template('labeling.html', 
                          comic_id=comic_id,
@@ -152,6 +409,7 @@ def save_label():
     if not comic_id or not selected:
         return jsonify({'error': 'Missing required fields'}), 400
     
+    labeling_app = get_labeling_app()
     success = labeling_app.save_label(comic_id, selected, custom_explanation)
     if not success:
         return jsonify({'error': 'Failed to save label'}), 500
@@ -168,12 +426,12 @@ def save_label():
 @app.route('/api/progress')
 def get_progress():
     """API endpoint to get progress"""
-    return jsonify(labeling_app.get_progress())
+    return jsonify(get_labeling_app().get_progress())
 
 @app.route('/complete')
 def complete():
     """Completion page"""
-    return render_template('complete.html', progress=labeling_app.get_progress())
+    return render_template('complete.html', progress=get_labeling_app().get_progress())
 
 @app.route('/pbf_comics/<filename>')
 def serve_comic_image(filename):
@@ -204,4 +462,8 @@ if __name__ == '__main__':
     # Create templates directory if it doesn't exist
     os.makedirs('templates', exist_ok=True)
     
-    app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
+    # Development server; set FLASK_DEBUG=1 for the debugger and reloader. For a sturdier
+    # server, run `gunicorn -w 1 --threads 8 -b 127.0.0.1:5000 labeling_app:app`. Keep it to
+    # one worker process: label state lives in memory, and separate workers would overwrite
+    # each other's snapshots.
+    app.run(debug=os.getenv('FLASK_DEBUG') == '1', host='127.0.0.1', port=5000, threaded=True)
\ No newline at end of file
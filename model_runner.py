@@ -6,38 +6,155 @@ Handles authentication, rate limiting, and retries.
 import os
 import time
 import base64
+import copy
 import asyncio
-import tempfile
-import atexit
-from typing import Dict, List, Optional, Any
+import io
+import mmap
+import threading
+import functools
+import importlib
+import weakref
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 from abc import ABC, abstractmethod
 import yaml
-import json
-from pathlib import Path
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Track temporary files for cleanup
-_temp_files = []
+_UTC = timezone.utc
 
-def _cleanup_temp_files():
-    """Clean up temporary files on exit"""
-    for temp_file in _temp_files:
+# Image helpers are keyed on (path, mtime, size) so an edited file is never served stale.
+# The same comic goes to every provider, and again on retries, so each is done once per image.
+
+_SUFFIX_MEDIA_TYPES = {
+    '.png': "image/png",
+    '.jpg': "image/jpeg",
+    '.jpeg': "image/jpeg",
+    '.gif': "image/gif",
+    '.webp': "image/webp"
+}
+
+def _media_type(image_path: str) -> str:
+    """Determine an image's media type from its extension"""
+    return _SUFFIX_MEDIA_TYPES.get(os.path.splitext(image_path)[1].lower(), "image/jpeg")
+
+def _gif_to_png(image_path: str) -> bytes:
+    """Convert a GIF's first frame to PNG bytes in memory"""
+    from PIL import Image
+    
+    with Image.open(image_path) as img:
+        # Get the first frame if it's an animated GIF
+        if hasattr(img, 'n_frames') and img.n_frames > 1:
+            img.seek(0)
+        # Convert to RGB if necessary (some GIFs might be in palette mode)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGB')
+        buffer = io.BytesIO()
+        img.save(buffer, 'PNG')
+    
+    logger.info(f"Converted GIF to PNG in memory: {image_path}")
+    return buffer.getvalue()
+
+@functools.lru_cache(maxsize=16)  # Raw bytes are only sent directly by Google
+def _image_bytes(image_path: str, mtime_ns: int, size: int) -> Tuple[bytes, str]:
+    """Read an image in a format every provider accepts (GIFs become PNG).
+    Returns (data, media_type)."""
+    if image_path.lower().endswith('.gif'):
         try:
-            if os.path.exists(temp_file):
-                os.unlink(temp_file)
-                logger.debug(f"Cleaned up temporary file: {temp_file}")
+            return _gif_to_png(image_path), "image/png"
         except Exception as e:
-            logger.warning(f"Failed to clean up temporary file {temp_file}: {e}")
-    _temp_files.clear()
+            logger.warning(f"Failed to convert GIF to PNG: {e}. Using original file.")
+    
+    with open(image_path, "rb") as image_file:
+        return image_file.read(), _media_type(image_path)
+
+# Image preparation runs in worker threads. Each version of an image gets its own lock, so
+# providers asking for the same image at once wait for one preparation instead of each doing
+# it, while different images are prepared in parallel. Locks go away once no thread holds one.
+_image_locks = weakref.WeakValueDictionary()
+_image_locks_guard = threading.Lock()
+
+def _image_key(image_path: str) -> Tuple[str, int, int]:
+    """Cache key for the current version of an image file: (path, mtime_ns, size)"""
+    st = os.stat(image_path)
+    return image_path, st.st_mtime_ns, st.st_size
+
+def _image_lock(key: Tuple[str, int, int]) -> threading.Lock:
+    """Get the lock serializing preparation of one version of an image"""
+    with _image_locks_guard:
+        lock = _image_locks.get(key)
+        if lock is None:
+            lock = _image_locks[key] = threading.Lock()
+        return lock
+
+# Below this, a plain read() beats the cost of setting up a mapping
+_MMAP_MIN_SIZE = 64 * 1024
+
+# Entries are multi-megabyte strings, so only the comics currently in flight are kept
+@functools.lru_cache(maxsize=16)
+def _encoded_image(image_path: str, mtime_ns: int, size: int) -> Tuple[str, str]:
+    """Base64-encode an image, returning (data, media_type)"""
+    try:
+        import pybase64 as b64  # Optional: SIMD-accelerated drop-in for base64
+    except ImportError:
+        b64 = base64
+    
+    if image_path.lower().endswith('.gif') or size < _MMAP_MIN_SIZE:
+        data, media_type = _image_bytes(image_path, mtime_ns, size)
+        return b64.b64encode(data).decode('ascii'), media_type
+    
+    # Encode straight from the page cache rather than copying the whole file into a bytes object
+    with open(image_path, "rb") as image_file:
+        with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return b64.b64encode(mapped).decode('ascii'), _media_type(image_path)
+
+def encode_image_file(image_path: str) -> Tuple[str, str]:
+    """Base64-encode an image for upload, returning (data, media_type).
+    Shared by the providers and the judge, so each comic is read and encoded once."""
+    key = _image_key(image_path)
+    with _image_lock(key):
+        return _encoded_image(*key)
+
+@functools.lru_cache(maxsize=8)  # Data URLs are only sent by OpenAI and xAI
+def _image_data_url(image_path: str, mtime_ns: int, size: int) -> str:
+    """Build a base64 data URL for an image file"""
+    data, media_type = _encoded_image(image_path, mtime_ns, size)
+    return f"data:{media_type};base64,{data}"
+
+# SDKs share dependencies (pydantic, httpx) whose imports aren't safe to run concurrently,
+# so providers constructed in parallel still import one at a time
+_import_lock = threading.Lock()
+
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml bindings, when PyYAML was built with them
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+@functools.lru_cache(maxsize=8)
+def _parse_config(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader)
 
-# Register cleanup function
-atexit.register(_cleanup_temp_files)
+def load_config(config_path: str) -> Dict[str, Any]:
+    """Load a YAML config, parsing it only once while the file is unchanged.
+    Returns a fresh copy, so callers may modify it."""
+    st = os.stat(config_path)
+    return copy.deepcopy(_parse_config(config_path, st.st_mtime_ns, st.st_size))
+
+@functools.lru_cache(maxsize=None)
+def _optional_import(module_name: str):
+    """Import an SDK module once per process, returning None if it isn't installed"""
+    with _import_lock:
+        try:
+            return importlib.import_module(module_name)
+        except ImportError:
+            return None
 
 @dataclass
 class ModelResponse:
@@ -51,8 +168,19 @@ class ModelResponse:
 
 class ModelProvider(ABC):
     """Abstract base class for model providers"""
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], http_client=None):
         self.config = config
+        # Shared connection pool for SDKs that accept one (None means the SDK default)
+        self.http_client = http_client
+        # Request settings that don't change between calls
+        self.request_kwargs = {
+            'model': config['model'],
+            'max_tokens': config['max_tokens'],
+            'temperature': config['temperature']
+        }
+        self._text_blocks = {}
+        # Blocking calls run here; None means the event loop's default executor
+        self.executor = None
         self.api_key = os.getenv(config['api_key_env'])
         if not self.api_key:
             raise ValueError(f"API key not found in environment variable: {config['api_key_env']}")
@@ -62,81 +190,65 @@ class ModelProvider(ABC):
         """Generate a response for the given prompt and image"""
         pass
     
-    def encode_image(self, image_path: str) -> str:
-        """Encode image to base64"""
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+    async def run_blocking(self, func, *args, **kwargs):
+        """Run a blocking call off the event loop, on the provider's executor"""
+        call = functools.partial(func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
     
-    def _ensure_compatible_format(self, image_path: str) -> str:
-        """Convert image to compatible format if needed (e.g., GIF to PNG).
-        This ensures consistency across all providers."""
-        if not image_path.lower().endswith('.gif'):
-            return image_path
-        
-        try:
-            from PIL import Image
-            
-            # Create a temporary PNG file
-            temp_png = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-            temp_png_path = temp_png.name
-            temp_png.close()
-            
-            # Convert GIF to PNG
-            with Image.open(image_path) as img:
-                # Get the first frame if it's an animated GIF
-                if hasattr(img, 'n_frames') and img.n_frames > 1:
-                    img.seek(0)
-                # Convert to RGB if necessary (some GIFs might be in palette mode)
-                if img.mode not in ('RGB', 'RGBA'):
-                    img = img.convert('RGB')
-                img.save(temp_png_path, 'PNG')
-            
-            # Track for cleanup
-            _temp_files.append(temp_png_path)
-            
-            logger.info(f"Converted GIF to PNG: {image_path} -> {temp_png_path}")
-            return temp_png_path
-            
-        except Exception as e:
-            logger.warning(f"Failed to convert GIF to PNG: {e}. Using original file.")
-            return image_path
+    def encode_image(self, image_path: str) -> Tuple[str, str]:
+        """Encode image to base64, returning (data, media_type).
+        GIFs are converted to PNG so every provider sees the same image."""
+        return encode_image_file(image_path)
+    
+    def image_bytes(self, image_path: str) -> Tuple[bytes, str]:
+        """Get the raw image bytes (GIFs converted to PNG), returning (data, media_type)"""
+        key = _image_key(image_path)
+        with _image_lock(key):
+            return _image_bytes(*key)
+    
+    def image_data_url(self, image_path: str) -> str:
+        """Get a data URL for the image, reusing it while the file is unchanged"""
+        key = _image_key(image_path)
+        with _image_lock(key):
+            return _image_data_url(*key)
+    
+    def text_block(self, prompt: str) -> Dict[str, str]:
+        """Get the text content block for a prompt, built once since every image shares it"""
+        block = self._text_blocks.get(prompt)
+        if block is None:
+            block = self._text_blocks[prompt] = {"type": "text", "text": prompt}
+        return block
 
 class AnthropicProvider(ModelProvider):
     """Provider for Anthropic Claude models"""
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
+    def __init__(self, config: Dict[str, Any], http_client=None):
+        super().__init__(config, http_client)
+        anthropic = _optional_import('anthropic')
+        if anthropic is None:
+            raise ImportError("Please install anthropic: pip install anthropic")
         try:
-            import anthropic
             logger.info(f"Anthropic version: {anthropic.__version__}")
             # Initialize with explicit parameters only
-            self.client = anthropic.Anthropic(
+            self.client = anthropic.AsyncAnthropic(
                 api_key=self.api_key,
-                max_retries=0  # We handle retries ourselves
+                max_retries=0,  # We handle retries ourselves
+                http_client=self.http_client
             )
             logger.info("✅ Anthropic client initialized successfully")
-        except ImportError:
-            raise ImportError("Please install anthropic: pip install anthropic")
         except Exception as e:
             logger.error(f"Failed to initialize Anthropic client: {e}")
             raise
     
     async def generate(self, prompt: str, image_path: str) -> ModelResponse:
-        start_time = time.time()
-        timestamp = datetime.utcnow().isoformat()
+        start_ns = time.perf_counter_ns()
+        timestamp = datetime.now(_UTC).isoformat()
         
         try:
-            # Convert GIF to PNG if needed for compatibility
-            compatible_path = self._ensure_compatible_format(image_path)
-            
-            # Read image and determine media type
-            image_data = self.encode_image(compatible_path)
-            media_type = "image/png" if compatible_path.endswith('.png') else "image/jpeg"
+            # Read image (GIFs are converted to PNG) and determine media type, off the event loop
+            image_data, media_type = await self.run_blocking(self.encode_image, image_path)
             
             # Create message with image
-            message = self.client.messages.create(
-                model=self.config['model'],
-                max_tokens=self.config['max_tokens'],
-                temperature=self.config['temperature'],
+            message = await self.client.messages.create(
                 messages=[{
                     "role": "user",
                     "content": [
@@ -148,15 +260,13 @@ class AnthropicProvider(ModelProvider):
                                 "data": image_data
                             }
                         },
-                        {
-                            "type": "text",
-                            "text": prompt
-                        }
+                        self.text_block(prompt)
                     ]
-                }]
+                }],
+                **self.request_kwargs
             )
             
-            latency_ms = (time.time() - start_time) * 1000
+            latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             return ModelResponse(
                 model_id=self.config['model'],
@@ -176,48 +286,49 @@ class AnthropicProvider(ModelProvider):
                 model_id=self.config['model'],
                 text="",
                 usage={},
-                latency_ms=(time.time() - start_time) * 1000,
+                latency_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
                 timestamp=timestamp,
                 error=str(e)
             )
 
 class GoogleProvider(ModelProvider):
     """Provider for Google Gemini models"""
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
+    def __init__(self, config: Dict[str, Any], http_client=None):
+        super().__init__(config, http_client)
+        genai = _optional_import('google.generativeai')
+        if genai is None:
+            raise ImportError("Please install google-generativeai: pip install google-generativeai")
         try:
-            import google.generativeai as genai
             logger.info(f"Google Generative AI version: {genai.__version__}")
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel(config['model'])
+            self.generation_config = {
+                'temperature': config['temperature'],
+                'max_output_tokens': config['max_tokens'],
+            }
             logger.info("✅ Google Gemini client initialized successfully")
-        except ImportError:
-            raise ImportError("Please install google-generativeai: pip install google-generativeai")
         except Exception as e:
             logger.error(f"Failed to initialize Google client: {e}")
             raise
     
     async def generate(self, prompt: str, image_path: str) -> ModelResponse:
-        start_time = time.time()
-        timestamp = datetime.utcnow().isoformat()
+        start_ns = time.perf_counter_ns()
+        timestamp = datetime.now(_UTC).isoformat()
         
         try:
-            # Convert GIF to PNG if needed for compatibility
-            compatible_path = self._ensure_compatible_format(image_path)
-            
-            import PIL.Image
-            image = PIL.Image.open(compatible_path)
-            
-            # Generate content
-            response = self.model.generate_content(
+            # Send the file bytes as-is (GIFs are converted to PNG for compatibility).
+            # Passing a blob skips a PIL decode, and the SDK would re-encode an in-memory image as WebP
+            image_data, media_type = await self.run_blocking(self.image_bytes, image_path)
+            image = {'mime_type': media_type, 'data': image_data}
+            
+            # Generate content; the SDK call is blocking, so run it off the event loop
+            response = await self.run_blocking(
+                self.model.generate_content,
                 [prompt, image],
-                generation_config={
-                    'temperature': self.config['temperature'],
-                    'max_output_tokens': self.config['max_tokens'],
-                }
+                generation_config=self.generation_config
             )
             
-            latency_ms = (time.time() - start_time) * 1000
+            latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             # Extract token usage if available
             usage = {}
@@ -242,64 +353,57 @@ class GoogleProvider(ModelProvider):
                 model_id=self.config['model'],
                 text="",
                 usage={},
-                latency_ms=(time.time() - start_time) * 1000,
+                latency_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
                 timestamp=timestamp,
                 error=str(e)
             )
 
 class OpenAIProvider(ModelProvider):
     """Provider for OpenAI GPT models"""
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
+    def __init__(self, config: Dict[str, Any], http_client=None):
+        super().__init__(config, http_client)
+        openai = _optional_import('openai')
+        if openai is None:
+            raise ImportError("Please install openai: pip install openai")
         try:
-            import openai
             logger.info(f"OpenAI version: {openai.__version__}")
             # Initialize with explicit parameters only
-            self.client = openai.OpenAI(
+            self.client = openai.AsyncOpenAI(
                 api_key=self.api_key,
-                max_retries=0  # We handle retries ourselves
+                max_retries=0,  # We handle retries ourselves
+                http_client=self.http_client
             )
             logger.info("✅ OpenAI client initialized successfully")
-        except ImportError:
-            raise ImportError("Please install openai: pip install openai")
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI client: {e}")
             raise
     
     async def generate(self, prompt: str, image_path: str) -> ModelResponse:
-        start_time = time.time()
-        timestamp = datetime.utcnow().isoformat()
+        start_ns = time.perf_counter_ns()
+        timestamp = datetime.now(_UTC).isoformat()
         
         try:
-            # Convert GIF to PNG if needed for consistency
-            compatible_path = self._ensure_compatible_format(image_path)
-            
-            # Encode image
-            image_data = self.encode_image(compatible_path)
+            # Prepare the image off the event loop (GIFs are converted to PNG for consistency)
+            data_url = await self.run_blocking(self.image_data_url, image_path)
             
             # Create completion
-            response = self.client.chat.completions.create(
-                model=self.config['model'],
+            response = await self.client.chat.completions.create(
                 messages=[{
                     "role": "user",
                     "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        },
+                        self.text_block(prompt),
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{image_data}"
+                                "url": data_url
                             }
                         }
                     ]
                 }],
-                max_tokens=self.config['max_tokens'],
-                temperature=self.config['temperature']
+                **self.request_kwargs
             )
             
-            latency_ms = (time.time() - start_time) * 1000
+            latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             return ModelResponse(
                 model_id=self.config['model'],
@@ -319,54 +423,41 @@ class OpenAIProvider(ModelProvider):
                 model_id=self.config['model'],
                 text="",
                 usage={},
-                latency_ms=(time.time() - start_time) * 1000,
+                latency_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
                 timestamp=timestamp,
                 error=str(e)
             )
 
 class XAIProvider(ModelProvider):
     """Provider for xAI Grok models"""
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
+    def __init__(self, config: Dict[str, Any], http_client=None):
+        super().__init__(config, http_client)
+        xai_sdk = _optional_import('xai_sdk')
+        if xai_sdk is None:
+            raise ImportError("Please install xai-sdk: pip install xai-sdk")
+        self.xai_chat = _optional_import('xai_sdk.chat')
         try:
-            from xai_sdk import Client
             logger.info("xAI SDK imported successfully")
             # Initialize with explicit parameters only
-            self.client = Client(
+            self.client = xai_sdk.Client(
                 api_host="api.x.ai",
                 api_key=self.api_key
             )
             logger.info("✅ xAI client initialized successfully")
-        except ImportError:
-            raise ImportError("Please install xai-sdk: pip install xai-sdk")
         except Exception as e:
             logger.error(f"Failed to initialize xAI client: {e}")
             raise
     
     async def generate(self, prompt: str, image_path: str) -> ModelResponse:
-        start_time = time.time()
-        timestamp = datetime.utcnow().isoformat()
+        start_ns = time.perf_counter_ns()
+        timestamp = datetime.now(_UTC).isoformat()
         
         try:
-            # Convert GIF to PNG if needed for consistency
-            compatible_path = self._ensure_compatible_format(image_path)
-            
-            # Encode image to base64
-            image_data = self.encode_image(compatible_path)
-            
-            # Determine media type
-            if compatible_path.lower().endswith('.png'):
-                media_type = "image/png"
-            elif compatible_path.lower().endswith('.jpg') or compatible_path.lower().endswith('.jpeg'):
-                media_type = "image/jpeg"
-            else:
-                media_type = "image/png"  # Default to PNG
-            
-            # Create data URL
-            data_url = f"data:{media_type};base64,{image_data}"
+            # Create data URL off the event loop (GIFs are converted to PNG for consistency)
+            data_url = await self.run_blocking(self.image_data_url, image_path)
             
             # Create chat with the model
-            from xai_sdk.chat import image, user
+            image, user = self.xai_chat.image, self.xai_chat.user
             chat = self.client.chat.create(
                 model=self.config['model'],
                 temperature=self.config['temperature']
@@ -377,10 +468,10 @@ class XAIProvider(ModelProvider):
             chat.append(user(image(data_url, detail="high"), prompt))
             
             # Sample the response
-            # The sample method doesn't take max_len directly
-            response = chat.sample()
+            # The sample method doesn't take max_len directly, and it blocks, so run it off the event loop
+            response = await self.run_blocking(chat.sample)
             
-            latency_ms = (time.time() - start_time) * 1000
+            latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             # Extract token usage if available
             usage = {}
@@ -405,7 +496,7 @@ class XAIProvider(ModelProvider):
                 model_id=self.config['model'],
                 text="",
                 usage={},
-                latency_ms=(time.time() - start_time) * 1000,
+                latency_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
                 timestamp=timestamp,
                 error=str(e)
             )
@@ -420,49 +511,89 @@ class ModelRunner:
         'xai': XAIProvider
     }
     
-    def __init__(self, config_path: str = "models_config.yaml"):
-        """Initialize with configuration file"""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config_path: str = "models_config.yaml", config: Optional[Dict[str, Any]] = None):
+        """Initialize with configuration file, or with an already-loaded config dict"""
+        self.config = config if config is not None else load_config(config_path)
         
         self.providers = {}
         self.rate_limiters = {}
+        self.http_client = self._create_http_client()
         self._init_providers()
+        
+        # Resolve each model's provider, rate limiter and config once, rather than on every call
+        self._model_table = {
+            model_id: (self.providers.get(model_config['provider']),
+                       self.rate_limiters.get(model_config['provider']),
+                       model_config)
+            for model_id, model_config in self.config['models'].items()
+        }
+        retry_config = self.config.get('retry', {})
+        self._retry_settings = (
+            retry_config.get('max_attempts', 3),
+            retry_config.get('initial_delay', 1),
+            retry_config.get('backoff_factor', 2)
+        )
+    
+    def _create_http_client(self):
+        """Create the keep-alive connection pool shared by the Anthropic and OpenAI clients"""
+        try:
+            import httpx
+        except ImportError:  # Installed with the anthropic/openai SDKs; fall back to their defaults
+            return None
+        
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+            # Generous read timeout, like the SDK defaults; reasoning models can be slow
+            timeout=httpx.Timeout(600, connect=10),
+            follow_redirects=True
+        )
+    
+    def set_executor(self, executor):
+        """Run the providers' blocking calls on executor (None for the event loop's default)"""
+        for provider in self.providers.values():
+            provider.executor = executor
+    
+    async def aclose(self):
+        """Close pooled connections; call before the event loop shuts down"""
+        if self.http_client is not None:
+            await self.http_client.aclose()
     
     def _init_providers(self):
         """Initialize provider instances"""
-        required_providers = set()
-        
-        # Determine which providers are actually needed
+        # One pass: the first model config for each provider that is actually needed
+        provider_configs = {}
         for model_id, model_config in self.config['models'].items():
-            required_providers.add(model_config['provider'])
+            provider_configs.setdefault(model_config['provider'], model_config)
         
         failed_providers = []
+        pending = {}
         
-        for provider_name in required_providers:
+        for provider_name, model_config in provider_configs.items():
             if provider_name not in self.providers:
                 provider_class = self.PROVIDER_CLASSES.get(provider_name)
                 if not provider_class:
                     failed_providers.append(f"Unknown provider: {provider_name}")
                     continue
-                
-                try:
-                    # Find a model config for this provider
-                    model_config = None
-                    for _, config in self.config['models'].items():
-                        if config['provider'] == provider_name:
-                            model_config = config
-                            break
-                    
-                    self.providers[provider_name] = provider_class(model_config)
-                    # Initialize rate limiter
-                    rate_limit = self.config['rate_limits'].get(provider_name, 60)
-                    self.rate_limiters[provider_name] = RateLimiter(rate_limit)
-                    logger.info(f"✅ Initialized provider: {provider_name}")
-                except Exception as e:
-                    error_msg = f"Failed to initialize provider {provider_name}: {e}"
-                    logger.error(error_msg)
-                    failed_providers.append(error_msg)
+                pending[provider_name] = (provider_class, model_config)
+        
+        # SDK imports and client setup dominate startup, so construct providers concurrently
+        with ThreadPoolExecutor(max_workers=max(1, len(pending))) as executor:
+            futures = {
+                provider_name: executor.submit(provider_class, model_config, http_client=self.http_client)
+                for provider_name, (provider_class, model_config) in pending.items()
+            }
+        
+        for provider_name, future in futures.items():
+            try:
+                self.providers[provider_name] = future.result()
+                # Initialize rate limiter
+                rate_limit = self.config['rate_limits'].get(provider_name, 60)
+                self.rate_limiters[provider_name] = RateLimiter(rate_limit)
+                logger.info(f"✅ Initialized provider: {provider_name}")
+            except Exception as e:
+                error_msg = f"Failed to initialize provider {provider_name}: {e}"
+                logger.error(error_msg)
+                failed_providers.append(error_msg)
         
         if failed_providers:
             logger.error("❌ Failed to initialize required providers:")
@@ -470,14 +601,14 @@ class ModelRunner:
                 logger.error(f"  - {error}")
             raise RuntimeError(f"Provider initialization failed. Please check your API keys and dependencies.")
     
-    async def run_model(self, model_id: str, prompt: str, image_path: str) -> ModelResponse:
-        """Run a specific model with rate limiting and retries"""
-        if model_id not in self.config['models']:
+    async def run_model(self, model_id: str, prompt: str, image_path: str,
+                        slots: Optional[asyncio.Semaphore] = None) -> ModelResponse:
+        """Run a specific model with rate limiting and retries.
+        If slots is given, one is held for each attempt but not while backing off between them."""
+        entry = self._model_table.get(model_id)
+        if entry is None:
             raise ValueError(f"Unknown model: {model_id}")
-        
-        model_config = self.config['models'][model_id]
-        provider_name = model_config['provider']
-        provider = self.providers.get(provider_name)
+        provider, rate_limiter, model_config = entry
         
         if not provider:
             return ModelResponse(
@@ -485,23 +616,20 @@ class ModelRunner:
                 text="",
                 usage={},
                 latency_ms=0,
-                timestamp=datetime.utcnow().isoformat(),
-                error=f"Provider {provider_name} not initialized"
+                timestamp=datetime.now(_UTC).isoformat(),
+                error=f"Provider {model_config['provider']} not initialized"
             )
         
         # Apply rate limiting
-        rate_limiter = self.rate_limiters.get(provider_name)
         if rate_limiter:
             await rate_limiter.acquire()
         
         # Retry logic
-        retry_config = self.config.get('retry', {})
-        max_attempts = retry_config.get('max_attempts', 3)
-        delay = retry_config.get('initial_delay', 1)
-        backoff = retry_config.get('backoff_factor', 2)
+        max_attempts, delay, backoff = self._retry_settings
         
         for attempt in range(max_attempts):
-            response = await provider.generate(prompt, image_path)
+            async with slots or nullcontext():
+                response = await provider.generate(prompt, image_path)
             
             if not response.error:
                 return response
@@ -514,7 +642,8 @@ class ModelRunner:
         return response
     
     async def run_models(self, model_ids: List[str], prompt: str, image_path: str) -> Dict[str, ModelResponse]:
-        """Run multiple models in parallel"""
+        """Run multiple models in parallel.
+        Rate limits are per provider and never block the loop, so providers progress independently."""
         tasks = []
         for model_id in model_ids:
             task = self.run_model(model_id, prompt, image_path)
@@ -528,23 +657,21 @@ class RateLimiter:
     def __init__(self, rate: int):
         self.rate = rate  # requests per minute
         self.tokens = rate
-        self.last_update = time.time()
-        self.lock = asyncio.Lock()
+        self.last_update = time.monotonic()
     
     async def acquire(self):
         """Wait if necessary to respect rate limit"""
-        async with self.lock:
-            now = time.time()
-            elapsed = now - self.last_update
-            self.tokens = min(self.rate, self.tokens + elapsed * (self.rate / 60))
-            self.last_update = now
-            
-            if self.tokens < 1:
-                sleep_time = (1 - self.tokens) * (60 / self.rate)
-                await asyncio.sleep(sleep_time)
-                self.tokens = 1
-            
-            self.tokens -= 1
+        # No await between reading and updating the bucket, so this is atomic on the event loop
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.tokens = min(self.rate, self.tokens + elapsed * (self.rate / 60))
+        self.last_update = now
+        
+        # Take a token up front; a negative balance reserves one from a future refill,
+        # so waiting callers sleep concurrently instead of queueing behind each other
+        self.tokens -= 1
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens * (60 / self.rate))
 
 # Example usage
 if __name__ == "__main__":
@@ -4,19 +4,23 @@ Run the PBF Comics benchmark against specified AI models.
 Generates explanations and scores them against ground truth using a judge.
 """
 import os
-import json
 import csv
 import asyncio
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 import logging
 from tqdm import tqdm
 from dotenv import load_dotenv
 
-from model_runner import ModelRunner, ModelResponse
+from model_runner import ModelRunner, ModelResponse, load_config
 from judge import ComicExplanationJudge, JudgeScore
+from json_utils import json_loads, json_dumps, load_json_file
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +29,61 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+_UTC = timezone.utc
+
+def _existing_files(paths) -> set:
+    """Return which of the given file paths exist, listing each parent directory once"""
+    listings = {}
+    existing = set()
+    for path in paths:
+        directory, name = os.path.split(path)
+        names = listings.get(directory)
+        if names is None:
+            try:
+                with os.scandir(directory or '.') as entries:
+                    names = {entry.name for entry in entries if entry.is_file()}
+            except OSError:
+                names = set()
+            listings[directory] = names
+        # Confirm misses with a stat, e.g. for a differently-cased name on a case-insensitive filesystem
+        if name in names or os.path.exists(path):
+            existing.add(path)
+    return existing
+
+# Summary metrics and the judge score field each is read from
+_SUMMARY_METRICS = tuple((metric, f'{metric}_score')
+                         for metric in ('overall', 'accuracy', 'completeness', 'insight', 'clarity'))
+
+def _has_failures(result: Dict, models: List[str]) -> bool:
+    """Whether any model's explanation or judge score in a comic result is an error placeholder"""
+    for model in models:
+        if result['explanations'].get(model, '').startswith('[Error:'):
+            return True
+        if result['scores'].get(model, {}).get('reasoning', '').startswith('Error: '):
+            return True
+    return False
+
+# Per-model summary columns at the end of each results CSV row
+_CSV_SUMMARY_FIELDS = ('average_score', 'median_score', 'min_score', 'max_score', 'total_comics')
+
+def _summary_columns(stats: Dict) -> List[Any]:
+    """Values for the summary CSV columns from a model's summary stats"""
+    overall = stats['overall']
+    return [overall['mean'], overall['median'], overall['min'], overall['max'], stats['count']]
+
+def _score_stats(values: List[float], with_range: bool = False) -> Dict[str, float]:
+    """Mean and median of a non-empty score list (plus min and max if asked), from one sort"""
+    ordered = sorted(values)
+    stats = {
+        'mean': sum(values) / len(values),
+        # Upper median for even counts, matching previously published results
+        'median': ordered[len(ordered) // 2]
+    }
+    if with_range:
+        stats['min'] = ordered[0]
+        stats['max'] = ordered[-1]
+    return stats
+
 class BenchmarkRunner:
     def __init__(self, 
                  config_path: str = "models_config.yaml",
@@ -33,7 +92,11 @@ class BenchmarkRunner:
                  comics_metadata_file: str = "pbf_comics_metadata.json",
                  results_csv: str = "benchmark_results.csv",
                  details_json: str = "benchmark_details.json",
-                 save_mode: str = "auto"):
+                 save_mode: str = "auto",
+                 concurrency: Optional[int] = None,
+                 resume: bool = True,
+                 judge_concurrency: Optional[int] = None,
+                 compact_json: bool = False):
         """Initialize benchmark runner"""
         self.config_path = config_path
         self.ground_truth_file = ground_truth_file
@@ -42,28 +105,72 @@ class BenchmarkRunner:
         self.results_csv = results_csv
         self.details_json = details_json
         self.save_mode = save_mode
-        
-        # Initialize components
-        self.runner = ModelRunner(config_path)
-        self.judge = ComicExplanationJudge(config_path)
-        
-        # Load data
-        self.ground_truth = self._load_ground_truth()
-        self.ai_explanations = self._load_ai_explanations()
-        self.comics_metadata = self._load_comics_metadata()
-        self.config = self.runner.config
-        
-        logger.info(f"Loaded {len(self.ground_truth)} ground truth labels")
-        logger.info(f"Loaded {len(self.ai_explanations)} AI explanations")
-        logger.info(f"Loaded {len(self.comics_metadata)} comics metadata")
+        # The details file is tracked in git, so it stays indented unless compact output is asked for
+        self.compact_json = compact_json
+        # Comics run at once; None uses benchmark_concurrency from the config
+        self.concurrency = concurrency
+        # Judge calls in flight across all comics; None uses max_judge_concurrency from the config
+        self.judge_concurrency = judge_concurrency
+        # Each finished comic is journaled so an interrupted run can pick up where it left off
+        self.journal_file = os.path.splitext(details_json)[0] + '.jsonl'
+        self.resume = resume
+        # The details this runner last wrote, with the file's (mtime, size) when it did
+        self._saved_details = None
+    
+    # Components and data files are loaded on first use, so saving or inspecting
+    # results doesn't pay for API client setup or the large JSON loads
+    
+    @cached_property
+    def runner(self) -> ModelRunner:
+        # Runner, judge and benchmark all share the one parsed config
+        return ModelRunner(self.config_path, config=self.config)
+    
+    @cached_property
+    def judge(self) -> ComicExplanationJudge:
+        # The judge shares the runner's providers (and rate limiters) instead of building its own
+        return ComicExplanationJudge(self.config_path, runner=self.runner, max_concurrency=self.judge_concurrency)
+    
+    @cached_property
+    def config(self) -> Dict:
+        return load_config(self.config_path)
+    
+    # Config values read per comic or per CSV row are resolved once
+    
+    @cached_property
+    def explain_prompt(self) -> str:
+        return self.config['prompts']['explain_comic']
+    
+    @cached_property
+    def model_versions(self) -> Dict[str, str]:
+        """Versioned model name for each configured model ID"""
+        return {model_id: model_config.get('model', 'unknown')
+                for model_id, model_config in self.config['models'].items()}
+    
+    @cached_property
+    def ground_truth(self) -> Dict:
+        ground_truth = self._load_ground_truth()
+        logger.info(f"Loaded {len(ground_truth)} ground truth labels")
+        return ground_truth
+    
+    @cached_property
+    def ai_explanations(self) -> Dict:
+        # Not used by run_benchmark itself, so the file is only read if something asks for it
+        ai_explanations = self._load_ai_explanations()
+        logger.info(f"Loaded {len(ai_explanations)} AI explanations")
+        return ai_explanations
+    
+    @cached_property
+    def comics_metadata(self) -> List[Dict]:
+        comics_metadata = self._load_comics_metadata()
+        logger.info(f"Loaded {len(comics_metadata)} comics metadata")
+        return comics_metadata
     
     def _load_ground_truth(self) -> Dict:
         """Load ground truth labels"""
         if not os.path.exists(self.ground_truth_file):
             raise FileNotFoundError(f"Ground truth file not found: {self.ground_truth_file}")
         
-        with open(self.ground_truth_file, 'r') as f:
-            return json.load(f)
+        return load_json_file(self.ground_truth_file)
     
     def _load_ai_explanations(self) -> Dict:
         """Load AI explanations"""
@@ -71,77 +178,78 @@ class BenchmarkRunner:
             logger.warning(f"AI explanations file not found: {self.ai_explanations_file}")
             return {}
         
-        with open(self.ai_explanations_file, 'r') as f:
-            return json.load(f)
+        return load_json_file(self.ai_explanations_file)
     
     def _load_comics_metadata(self) -> List[Dict]:
         """Load comics metadata"""
         if not os.path.exists(self.comics_metadata_file):
             raise FileNotFoundError(f"Comics metadata file not found: {self.comics_metadata_file}")
         
-        with open(self.comics_metadata_file, 'r') as f:
-            return json.load(f)
+        return load_json_file(self.comics_metadata_file)
+    
+    @cached_property
+    def comics_by_id(self) -> Dict[str, Dict]:
+        """Comics metadata indexed by comic ID (filename)"""
+        return {comic['filename']: comic for comic in self.comics_metadata}
     
     def _get_ground_truth_explanation(self, comic_id: str) -> Optional[str]:
         """Get the ground truth explanation for a comic"""
-        if comic_id not in self.ground_truth:
+        gt_data = self.ground_truth.get(comic_id)
+        if gt_data is None:
             return None
         
-        gt_data = self.ground_truth[comic_id]
         return gt_data.get('explanation')
     
+    async def _generate_explanation(self, model_id: str, prompt: str, image_path: str, comic_id: str) -> str:
+        """Generate one model's explanation, recording API errors in place of the text"""
+        response = await self.runner.run_model(model_id, prompt, image_path)
+        
+        if response.error:
+            logger.warning(f"Error from {model_id} for {comic_id}: {response.error}")
+            return f"[Error: {response.error}]"
+        return response.text
+    
     async def run_single_comic(self, 
                              comic: Dict,
                              models: List[str],
                              ground_truth_explanation: str) -> Dict[str, Any]:
-        """Run benchmark on a single comic"""
+        """Run benchmark on a single comic whose image exists (run_benchmark checks them all up front)"""
         comic_id = comic['filename']
         image_path = comic['local_path']
         
-        if not os.path.exists(image_path):
-            logger.error(f"Image not found: {image_path}")
-            return {
-                'comic_id': comic_id,
-                'error': f"Image not found: {image_path}",
-                'explanations': {},
-                'scores': {}
-            }
-        
-        # Generate explanations from all models
-        prompt = self.config['prompts']['explain_comic']
-        explanations_responses = await self.runner.run_models(models, prompt, image_path)
-        
-        # Extract text from responses
-        explanations = {}
-        for model_id, response in explanations_responses.items():
-            if response.error:
-                logger.warning(f"Error from {model_id} for {comic_id}: {response.error}")
-                explanations[model_id] = f"[Error: {response.error}]"
-            else:
-                explanations[model_id] = response.text
-        
-        # Judge all explanations
-        scores = await self.judge.judge_multiple_explanations(
-            image_path,
-            ground_truth_explanation,
-            explanations
-        )
+        # Generate explanations from all models, judging each one as soon as it is
+        # ready so judge calls overlap generation from slower models
+        prompt = self.explain_prompt
+        explanation_tasks = {
+            model_id: asyncio.create_task(self._generate_explanation(model_id, prompt, image_path, comic_id))
+            for model_id in models
+        }
+        judge_tasks = {}
+        if self.config.get('judge_batch_size', 1) <= 1 or self.judge.ensemble_model_ids:
+            judge_tasks = self.judge.judge_interleaved(image_path, ground_truth_explanation, explanation_tasks)
+        
+        try:
+            judged = await asyncio.gather(*judge_tasks.values(), *explanation_tasks.values())
+        except BaseException:
+            # A generation failure fails the whole comic; don't leave siblings running
+            for task in (*explanation_tasks.values(), *judge_tasks.values()):
+                task.cancel()
+            raise
+        
+        explanations = {model_id: task.result() for model_id, task in explanation_tasks.items()}
+        if judge_tasks:
+            scores = dict(zip(judge_tasks, judged))
+        else:
+            # Batched judging needs every explanation up front
+            scores = await self.judge.judge_multiple_explanations(image_path, ground_truth_explanation, explanations)
         
         return {
             'comic_id': comic_id,
             'comic_title': comic.get('comic_title', ''),
             'explanations': explanations,
-            'scores': {model: {
-                'overall_score': score.overall_score,
-                'accuracy_score': score.accuracy_score,
-                'completeness_score': score.completeness_score,
-                'insight_score': score.insight_score,
-                'clarity_score': score.clarity_score,
-                'reasoning': score.reasoning,
-                'timestamp': score.timestamp
-            } for model, score in scores.items()},
+            'scores': {model: score.to_result_dict() for model, score in scores.items()},
             'ground_truth': ground_truth_explanation,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.now(_UTC).isoformat()
         }
     
     async def run_benchmark(self, 
@@ -149,129 +257,202 @@ class BenchmarkRunner:
                           limit: Optional[int] = None,
                           comic_ids: Optional[List[str]] = None) -> Dict[str, Any]:
         """Run full benchmark"""
+        # Parse the data files and set up the judge (and its model runner) on worker threads at once
+        await asyncio.gather(*(asyncio.to_thread(getattr, self, name)
+                               for name in ('ground_truth', 'comics_metadata', 'judge')))
+        
         if models is None:
             models = self.config['benchmark_models']
         
         logger.info(f"Running benchmark with models: {models}")
         
         # Filter comics based on ground truth availability
-        comics_to_test = []
-        
         if comic_ids:
             # Test specific comics
-            comic_id_to_metadata = {c['filename']: c for c in self.comics_metadata}
+            comics_to_test = []
             for comic_id in comic_ids:
-                if comic_id in comic_id_to_metadata and comic_id in self.ground_truth:
-                    comics_to_test.append(comic_id_to_metadata[comic_id])
+                comic = self.comics_by_id.get(comic_id)
+                if comic is not None and comic_id in self.ground_truth:
+                    comics_to_test.append(comic)
                 else:
                     logger.warning(f"Skipping {comic_id}: not found in metadata or ground truth")
         else:
-            # Test all comics with ground truth
-            for comic in self.comics_metadata:
-                comic_id = comic['filename']
-                if comic_id in self.ground_truth:
-                    comics_to_test.append(comic)
-                    if limit and len(comics_to_test) >= limit:
-                        break
+            # Test all comics with ground truth, stopping as soon as the limit is reached
+            ground_truth = self.ground_truth
+            comics_to_test = list(islice(
+                (comic for comic in self.comics_metadata if comic['filename'] in ground_truth),
+                limit or None
+            ))
         
         if not comics_to_test:
             raise ValueError("No comics found to test. Make sure you have ground truth labels.")
         
         logger.info(f"Testing {len(comics_to_test)} comics")
         
-        # Run benchmark on all comics
-        results = []
-        
-        with tqdm(total=len(comics_to_test), desc="Running benchmark") as pbar:
-            for comic in comics_to_test:
-                comic_id = comic['filename']
+        # Pick up comics finished by an interrupted run
+        if not self.resume and os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        completed = self._load_journal(models)
+        if completed:
+            logger.info(f"Resuming: {len(completed)} comics already done in {self.journal_file}")
+        
+        # Run benchmark on all comics concurrently; the semaphore bounds how many are in flight
+        concurrency = self.concurrency or self.config.get('benchmark_concurrency', 8)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        # Gemini and xAI calls hold a worker thread for their whole round trip, so the default
+        # executor (min(32, CPUs + 4) threads) could throttle them; the run gets its own pool
+        executor = ThreadPoolExecutor(max_workers=max(32, concurrency * len(models)),
+                                      thread_name_prefix='benchmark')
+        self.runner.set_executor(executor)
+        
+        try:
+            with tqdm(total=len(comics_to_test), desc="Running benchmark", mininterval=0.5) as pbar, \
+                    open(self.journal_file, 'ab') as journal:
+                if journal.tell():
+                    journal.write(b'\n')  # Terminate a last line torn by an interruption
+                async def run_comic(comic: Dict, gt_explanation: str) -> Dict[str, Any]:
+                    comic_id = comic['filename']
+                    async with semaphore:
+                        try:
+                            result = await self.run_single_comic(comic, models, gt_explanation)
+                            # Comics with failed models are left out so a resumed run retries them
+                            if not _has_failures(result, models):
+                                journal.write(json_dumps(result, indent=False) + b'\n')
+                                journal.flush()
+                            return result
+                        except Exception as e:
+                            logger.error(f"Error processing {comic_id}: {e}")
+                            return {
+                                'comic_id': comic_id,
+                                'error': str(e),
+                                'explanations': {},
+                                'scores': {}
+                            }
+                        finally:
+                            pbar.update(1)
                 
-                # Get ground truth explanation
-                gt_explanation = self._get_ground_truth_explanation(comic_id)
-                if not gt_explanation:
-                    logger.warning(f"No ground truth for {comic_id}, skipping")
-                    pbar.update(1)
-                    continue
+                # Check every image up front, listing each image directory once
+                available_images = _existing_files(comic['local_path'] for comic in comics_to_test)
                 
-                try:
-                    result = await self.run_single_comic(comic, models, gt_explanation)
-                    results.append(result)
-                except Exception as e:
-                    logger.error(f"Error processing {comic_id}: {e}")
-                    results.append({
-                        'comic_id': comic_id,
-                        'error': str(e),
-                        'explanations': {},
-                        'scores': {}
-                    })
+                results = []
+                runs = []  # (index into results, coroutine)
+                for comic in comics_to_test:
+                    comic_id = comic['filename']
+                    
+                    # Get ground truth explanation
+                    gt_explanation = self._get_ground_truth_explanation(comic_id)
+                    if not gt_explanation:
+                        logger.warning(f"No ground truth for {comic_id}, skipping")
+                        pbar.update(1)
+                        continue
+                    
+                    if comic_id in completed:
+                        results.append(completed[comic_id])
+                        pbar.update(1)
+                        continue
+                    
+                    image_path = comic['local_path']
+                    if image_path not in available_images:
+                        logger.error(f"Image not found: {image_path}")
+                        results.append({
+                            'comic_id': comic_id,
+                            'error': f"Image not found: {image_path}",
+                            'explanations': {},
+                            'scores': {}
+                        })
+                        pbar.update(1)
+                        continue
+                    
+                    results.append(None)
+                    runs.append((len(results) - 1, run_comic(comic, gt_explanation)))
                 
-                pbar.update(1)
+                # Results keep comic order; the progress bar advances as comics finish
+                finished = await asyncio.gather(*(coro for _, coro in runs))
+                for (index, _), result in zip(runs, finished):
+                    results[index] = result
+        finally:
+            self.runner.set_executor(None)
+            # Don't block the loop on calls still running if the run was cancelled
+            executor.shutdown(wait=False)
         
         # Calculate summary statistics
         summary = self._calculate_summary_stats(results, models)
         
         benchmark_results = {
             'metadata': {
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': datetime.now(_UTC).isoformat(),
                 'models': models,
                 'total_comics': len(results),
                 'config_file': self.config_path,
-                'judge_model': self.judge.judge_model_id
+                'judge_model': self.judge.judge_label
             },
             'summary': summary,
             'detailed_results': results
         }
         
-        # Save results
+        # Save results; once they are written the journal is no longer needed
         self._save_results(benchmark_results, mode=self.save_mode)
+        os.remove(self.journal_file)
         
         return benchmark_results
     
+    async def aclose(self):
+        """Close the judge's and model runner's pooled connections, if they were opened;
+        call before the event loop shuts down"""
+        if 'judge' in self.__dict__:
+            await self.judge.aclose()
+        if 'runner' in self.__dict__:
+            await self.runner.aclose()
+    
+    def _load_journal(self, models: List[str]) -> Dict[str, Dict]:
+        """Load comic results journaled by an interrupted run, keyed by comic ID.
+        Only results that scored every requested model without errors are reused, trimmed to those models."""
+        completed = {}
+        if not os.path.exists(self.journal_file):
+            return completed
+        
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                try:
+                    result = json_loads(line)
+                except ValueError:
+                    continue  # Blank, or torn by the interruption
+                
+                scores = result.get('scores', {})
+                if all(model in scores for model in models) and not _has_failures(result, models):
+                    result['explanations'] = {model: result['explanations'].get(model, '') for model in models}
+                    result['scores'] = {model: scores[model] for model in models}
+                    completed[result['comic_id']] = result
+        
+        return completed
+    
     def _calculate_summary_stats(self, results: List[Dict], models: List[str]) -> Dict:
         """Calculate summary statistics"""
+        # One pass over the results, collecting each model's score entries
+        entries = {model: [] for model in models}
+        for result in results:
+            for model, score_data in result.get('scores', {}).items():
+                model_entries = entries.get(model)
+                if model_entries is not None:
+                    model_entries.append(score_data)
+        
         summary = {}
         
         for model in models:
-            scores = []
-            accuracy_scores = []
-            completeness_scores = []
-            insight_scores = []
-            clarity_scores = []
-            
-            for result in results:
-                if model in result.get('scores', {}):
-                    score_data = result['scores'][model]
-                    scores.append(score_data['overall_score'])
-                    accuracy_scores.append(score_data['accuracy_score'])
-                    completeness_scores.append(score_data['completeness_score'])
-                    insight_scores.append(score_data['insight_score'])
-                    clarity_scores.append(score_data['clarity_score'])
+            model_entries = entries[model]
             
-            if scores:
+            if model_entries:
+                # Metric columns are only built for models that have scores
+                columns = {metric: [entry[field] for entry in model_entries]
+                           for metric, field in _SUMMARY_METRICS}
                 summary[model] = {
-                    'count': len(scores),
-                    'overall': {
-                        'mean': sum(scores) / len(scores),
-                        'median': sorted(scores)[len(scores) // 2],
-                        'min': min(scores),
-                        'max': max(scores)
-                    },
-                    'accuracy': {
-                        'mean': sum(accuracy_scores) / len(accuracy_scores),
-                        'median': sorted(accuracy_scores)[len(accuracy_scores) // 2]
-                    },
-                    'completeness': {
-                        'mean': sum(completeness_scores) / len(completeness_scores),
-                        'median': sorted(completeness_scores)[len(completeness_scores) // 2]
-                    },
-                    'insight': {
-                        'mean': sum(insight_scores) / len(insight_scores),
-                        'median': sorted(insight_scores)[len(insight_scores) // 2]
-                    },
-                    'clarity': {
-                        'mean': sum(clarity_scores) / len(clarity_scores),
-                        'median': sorted(clarity_scores)[len(clarity_scores) // 2]
-                    }
+                    'count': len(model_entries),
+                    'overall': _score_stats(columns['overall'], with_range=True),
+                    'accuracy': _score_stats(columns['accuracy']),
+                    'completeness': _score_stats(columns['completeness']),
+                    'insight': _score_stats(columns['insight']),
+                    'clarity': _score_stats(columns['clarity'])
                 }
             else:
                 summary[model] = {
@@ -281,18 +462,32 @@ class BenchmarkRunner:
         
         return summary
     
+    def _load_saved_details(self) -> Dict:
+        """Load the details JSON, skipping the parse if it is still the file this runner last wrote"""
+        stat = os.stat(self.details_json)
+        if self._saved_details is not None and self._saved_details[0] == (stat.st_mtime_ns, stat.st_size):
+            return self._saved_details[1]
+        return load_json_file(self.details_json)
+    
+    def _remember_saved_details(self, data: Dict):
+        """Keep the details just written, so a later merge in this process needn't re-read them"""
+        stat = os.stat(self.details_json)
+        self._saved_details = ((stat.st_mtime_ns, stat.st_size), data)
+    
     def _merge_and_save_results(self, new_results: Dict):
         """Merge new results with existing results and save"""
-        # Load existing results
-        with open(self.details_json, 'r') as f:
-            old_data = json.load(f)
+        # Load existing results, reusing what this runner last saved if the file hasn't changed
+        old_data = self._load_saved_details()
         
         # Merge detailed results
         old_results_map = {}
         for result in old_data.get('detailed_results', []):
             comic_id = result['comic_id']
             if comic_id not in old_results_map:
-                old_results_map[comic_id] = result
+                # Merging updates entries in place, so don't touch ones shared with earlier results
+                old_results_map[comic_id] = {**result,
+                                             'explanations': dict(result['explanations']),
+                                             'scores': dict(result['scores'])}
             else:
                 # Merge if there are multiple entries for the same comic
                 old_results_map[comic_id]['explanations'].update(result['explanations'])
@@ -314,7 +509,7 @@ class BenchmarkRunner:
         # Create merged data structure
         merged_data = {
             'metadata': new_results['metadata'],  # Use latest metadata
-            'detailed_results': sorted(old_results_map.values(), key=lambda x: x['comic_id'])
+            'detailed_results': sorted(old_results_map.values(), key=itemgetter('comic_id'))
         }
         
         # Recalculate summary for all models
@@ -322,32 +517,33 @@ class BenchmarkRunner:
         for result in merged_data['detailed_results']:
             all_models.update(result.get('explanations', {}).keys())
         
+        all_models = sorted(all_models)
         merged_data['summary'] = self._calculate_summary_stats(
             merged_data['detailed_results'], 
-            sorted(all_models)
+            all_models
         )
-        merged_data['metadata']['models'] = sorted(all_models)
+        merged_data['metadata']['models'] = all_models
         
         # Save merged JSON
-        with open(self.details_json, 'w') as f:
-            json.dump(merged_data, f, indent=2)
+        with open(self.details_json, 'wb') as f:
+            f.write(json_dumps(merged_data, indent=not self.compact_json))
+        self._remember_saved_details(merged_data)
         
         logger.info(f"Merged detailed results saved to {self.details_json}")
         logger.info(f"Updated models: {', '.join(sorted(new_models))}")
         
-        # Save merged CSV
-        self._save_merged_csv(merged_data, new_models)
+        # Save merged CSV; the merged results are already unique and sorted by comic ID
+        comic_ids = [result['comic_id'] for result in merged_data['detailed_results']]
+        self._save_merged_csv(merged_data, new_models, comic_ids)
     
-    def _save_merged_csv(self, merged_results: Dict, new_models: set):
-        """Save merged results to CSV"""
+    def _save_merged_csv(self, merged_results: Dict, new_models: set, comic_ids: Optional[List[str]] = None):
+        """Save merged results to CSV, with a column per comic in comic_ids (default: all, sorted)"""
         # Load existing CSV if it exists
         existing_rows = {}
-        existing_fieldnames = []
         
         if os.path.exists(self.results_csv):
             with open(self.results_csv, 'r') as f:
                 reader = csv.DictReader(f)
-                existing_fieldnames = list(reader.fieldnames) if reader.fieldnames else []
                 for row in reader:
                     existing_rows[row['model_name']] = row
         
@@ -356,18 +552,18 @@ class BenchmarkRunner:
         detailed_results = merged_results['detailed_results']
         
         # Determine all fieldnames needed
-        all_fieldnames = ['model_name', 'model_version', 'timestamp']
-        
-        # Add all comic columns
-        comic_ids = sorted(set(r['comic_id'] for r in detailed_results))
-        for comic_id in comic_ids:
-            field = f'comic_{comic_id}'
-            if field not in all_fieldnames:
-                all_fieldnames.append(field)
-        
-        # Add summary columns
-        summary_fields = ['average_score', 'median_score', 'min_score', 'max_score', 'total_comics']
-        all_fieldnames.extend(summary_fields)
+        if comic_ids is None:
+            comic_ids = sorted(set(r['comic_id'] for r in detailed_results))
+        all_fieldnames = self._csv_fieldnames(comic_ids)
+        
+        # Index each model's per-comic scores in one pass over the results
+        comic_scores = {model: {} for model in all_models}
+        for result in detailed_results:
+            field = f'comic_{result["comic_id"]}'
+            for model, score_data in result.get('scores', {}).items():
+                model_scores = comic_scores.get(model)
+                if model_scores is not None:
+                    model_scores[field] = score_data['overall_score']
         
         # Create rows for all models
         csv_data = []
@@ -377,7 +573,7 @@ class BenchmarkRunner:
             
             # Update basic info
             row['model_name'] = model
-            row['model_version'] = self.config['models'].get(model, {}).get('model', 'unknown')
+            row['model_version'] = self.model_versions.get(model, 'unknown')
             
             # Update timestamp only for new/updated models
             if model in new_models:
@@ -385,39 +581,19 @@ class BenchmarkRunner:
             elif 'timestamp' not in row:
                 row['timestamp'] = merged_results['metadata']['timestamp']
             
-            # Update per-comic scores
-            for result in detailed_results:
-                comic_id = result['comic_id']
-                field = f'comic_{comic_id}'
-                if model in result.get('scores', {}):
-                    score = result['scores'][model]['overall_score']
-                    row[field] = score
-                elif field not in row:
-                    row[field] = ''  # Leave empty rather than ERROR for missing comics
+            # Update per-comic scores; missing comics are left empty rather than ERROR
+            row.update(comic_scores[model])
             
             # Update summary statistics
-            if model in merged_results['summary']:
-                stats = merged_results['summary'][model]
-                if 'overall' in stats:
-                    row['average_score'] = stats['overall']['mean']
-                    row['median_score'] = stats['overall']['median']
-                    row['min_score'] = stats['overall']['min']
-                    row['max_score'] = stats['overall']['max']
-                    row['total_comics'] = stats['count']
+            stats = merged_results['summary'].get(model)
+            if stats is not None and 'overall' in stats:
+                row.update(zip(_CSV_SUMMARY_FIELDS, _summary_columns(stats)))
             
-            # Ensure all fields exist
-            for field in all_fieldnames:
-                if field not in row:
-                    row[field] = ''
-            
-            csv_data.append(row)
+            # Lay the row out in column order, leaving missing fields empty
+            csv_data.append([row.get(field, '') for field in all_fieldnames])
         
-        # Write CSV
         if csv_data:
-            with open(self.results_csv, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=all_fieldnames)
-                writer.writeheader()
-                writer.writerows(csv_data)
+            self._write_csv(all_fieldnames, csv_data)
         
         logger.info(f"Merged CSV results saved to {self.results_csv}")
     
@@ -441,8 +617,9 @@ class BenchmarkRunner:
         else:
             logger.info("Running in overwrite mode - replacing existing results")
             # Save detailed JSON
-            with open(self.details_json, 'w') as f:
-                json.dump(benchmark_results, f, indent=2)
+            with open(self.details_json, 'wb') as f:
+                f.write(json_dumps(benchmark_results, indent=not self.compact_json))
+            self._remember_saved_details(benchmark_results)
             
             logger.info(f"Detailed results saved to {self.details_json}")
             
@@ -456,49 +633,50 @@ class BenchmarkRunner:
         models = benchmark_results['metadata']['models']
         detailed_results = benchmark_results['detailed_results']
         
-        # Create CSV with one row per model
-        csv_data = []
+        if not models:
+            return
         
+        # A comic listed twice gets one column holding its last score, as a dict row would
+        scores_by_comic = {result['comic_id']: result.get('scores', {}) for result in detailed_results}
+        fieldnames = self._csv_fieldnames(scores_by_comic)
+        
+        rows = []
         for model in models:
-            row = {
-                'model_name': model,
-                'model_version': self.config['models'].get(model, {}).get('model', 'unknown'),
-                'timestamp': benchmark_results['metadata']['timestamp']
-            }
+            row = [
+                model,
+                self.model_versions.get(model, 'unknown'),
+                benchmark_results['metadata']['timestamp']
+            ]
             
             # Add per-comic scores
-            for result in detailed_results:
-                comic_id = result['comic_id']
-                if model in result.get('scores', {}):
-                    score = result['scores'][model]['overall_score']
-                    row[f'comic_{comic_id}'] = score
-                else:
-                    row[f'comic_{comic_id}'] = 'ERROR'
+            row.extend(scores[model]['overall_score'] if model in scores else 'ERROR'
+                       for scores in scores_by_comic.values())
             
             # Add summary statistics
-            if model in benchmark_results['summary']:
-                stats = benchmark_results['summary'][model]
-                if 'overall' in stats:
-                    row['average_score'] = stats['overall']['mean']
-                    row['median_score'] = stats['overall']['median']
-                    row['min_score'] = stats['overall']['min']
-                    row['max_score'] = stats['overall']['max']
-                    row['total_comics'] = stats['count']
-                else:
-                    row['average_score'] = 'ERROR'
-                    row['median_score'] = 'ERROR'
-                    row['min_score'] = 'ERROR'
-                    row['max_score'] = 'ERROR'
-                    row['total_comics'] = 0
+            stats = benchmark_results['summary'].get(model)
+            if stats is None:
+                row.extend([''] * len(_CSV_SUMMARY_FIELDS))
+            elif 'overall' in stats:
+                row.extend(_summary_columns(stats))
+            else:
+                row.extend(['ERROR', 'ERROR', 'ERROR', 'ERROR', 0])
             
-            csv_data.append(row)
+            rows.append(row)
         
-        # Write CSV
-        if csv_data:
-            with open(self.results_csv, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=csv_data[0].keys())
-                writer.writeheader()
-                writer.writerows(csv_data)
+        self._write_csv(fieldnames, rows)
+    
+    def _csv_fieldnames(self, comic_ids) -> List[str]:
+        """Results CSV header: model details, one column per comic, then the summary columns"""
+        return (['model_name', 'model_version', 'timestamp'] +
+                [f'comic_{comic_id}' for comic_id in comic_ids] +
+                list(_CSV_SUMMARY_FIELDS))
+    
+    def _write_csv(self, fieldnames: List[str], rows: List[List[Any]]):
+        """Write the results CSV in one batch through a single buffered writer"""
+        with open(self.results_csv, 'w', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(rows)
 
 async def main():
     parser = argparse.ArgumentParser(description='Run PBF Comics benchmark')
@@ -511,18 +689,29 @@ async def main():
     parser.add_argument('--output-json', default='benchmark_details.json', help='Output JSON file')
     parser.add_argument('--save-mode', choices=['auto', 'merge', 'overwrite'], default='auto',
                         help='How to save results: auto (merge if subset), merge (always merge), overwrite (replace)')
+    parser.add_argument('--compact-json', action='store_true',
+                        help='Write the details JSON without indentation (smaller and faster to write)')
+    parser.add_argument('--concurrency', type=int, help='Comics to run at once (default: benchmark_concurrency from config)')
+    parser.add_argument('--judge-concurrency', type=int,
+                        help='Judge calls in flight at once (default: max_judge_concurrency from config)')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Start over instead of reusing comics finished by an interrupted run')
     
     args = parser.parse_args()
     
+    runner = BenchmarkRunner(
+        ground_truth_file=args.ground_truth,
+        ai_explanations_file=args.ai_explanations,
+        results_csv=args.output_csv,
+        details_json=args.output_json,
+        save_mode=args.save_mode,
+        compact_json=args.compact_json,
+        concurrency=args.concurrency,
+        resume=not args.no_resume,
+        judge_concurrency=args.judge_concurrency
+    )
+    
     try:
-        runner = BenchmarkRunner(
-            ground_truth_file=args.ground_truth,
-            ai_explanations_file=args.ai_explanations,
-            results_csv=args.output_csv,
-            details_json=args.output_json,
-            save_mode=args.save_mode
-        )
-        
         results = await runner.run_benchmark(
             models=args.models,
             limit=args.limit,
@@ -548,6 +737,9 @@ async def main():
     except Exception as e:
         logger.error(f"Benchmark failed: {e}")
         return 1
+    finally:
+        # Close pooled connections while the event loop is still running, even after a failure
+        await runner.aclose()
     
     return 0
 
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for the labeling app's label journal: crash recovery, rotation and compaction,
+and the unlabeled-comic cursor.
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from labeling_app import LabelingApp
+
+def _label(text: str) -> dict:
+    return {'explanation': text, 'source_model': 'm', 'is_custom': False, 'labeled_by': 'human'}
+
+def _journal_line(comic_id: str, text: str) -> bytes:
+    return json.dumps({'comic_id': comic_id, 'label': _label(text)}).encode('utf-8') + b'\n'
+
+class LabelingJournalTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = self._tmp.name
+        self.explanations_file = os.path.join(self.dir, 'ai_explanations.json')
+        self.ground_truth_file = os.path.join(self.dir, 'ground_truth_labels.json')
+        self.journal_file = os.path.join(self.dir, 'ground_truth_labels.jsonl')
+        
+        explanations = {f'c{i}': {'explanations': {'m': f'text {i}'}} for i in range(5)}
+        with open(self.explanations_file, 'w') as f:
+            json.dump(explanations, f)
+    
+    def _app(self) -> LabelingApp:
+        app = LabelingApp(self.explanations_file, self.ground_truth_file)
+        self.addCleanup(app._snapshot_writer.shutdown)
+        return app
+    
+    def _snapshot(self) -> dict:
+        with open(self.ground_truth_file) as f:
+            return json.load(f)
+    
+    def _journals(self) -> list:
+        return sorted(name for name in os.listdir(self.dir) if name.startswith('ground_truth_labels.jsonl'))
+    
+    def test_replay_skips_truncated_last_line(self):
+        with open(self.journal_file, 'wb') as f:
+            f.write(_journal_line('c0', 'kept'))
+            f.write(_journal_line('c1', 'torn')[:20])  # Crash mid-append
+        
+        app = self._app()
+        
+        self.assertEqual(app.ground_truth, {'c0': _label('kept')})
+        # Recovered labels are folded into the snapshot and the journal is cleared
+        self.assertEqual(self._snapshot(), {'c0': _label('kept')})
+        self.assertEqual(self._journals(), [])
+    
+    def test_replay_applies_rotated_journals_oldest_first(self):
+        # Suffixes compare numerically, so .10 is newer than .9; the live journal is newest
+        with open(self.journal_file + '.9', 'wb') as f:
+            f.write(_journal_line('c0', 'oldest'))
+            f.write(_journal_line('c1', 'only in .9'))
+        with open(self.journal_file + '.10', 'wb') as f:
+            f.write(_journal_line('c0', 'middle'))
+            f.write(_journal_line('c2', 'only in .10'))
+        with open(self.journal_file, 'wb') as f:
+            f.write(_journal_line('c2', 'newest'))
+        
+        app = self._app()
+        
+        self.assertEqual(app.ground_truth, {
+            'c0': _label('middle'),
+            'c1': _label('only in .9'),
+            'c2': _label('newest'),
+        })
+        self.assertEqual(self._snapshot(), app.ground_truth)
+        self.assertEqual(self._journals(), [])
+    
+    def test_compaction_writes_snapshot_and_removes_journals(self):
+        app = self._app()
+        app.COMPACT_EVERY = 2
+        
+        for comic_id in ('c0', 'c1', 'c2', 'c3', 'c4'):
+            self.assertTrue(app.save_label(comic_id, 'm'))
+        
+        # Two background compactions were queued; the fifth label is still only journaled
+        app.save_ground_truth()
+        
+        snapshot = self._snapshot()
+        self.assertEqual(sorted(snapshot), ['c0', 'c1', 'c2', 'c3', 'c4'])
+        self.assertEqual(snapshot['c4']['explanation'], 'text 4')
+        self.assertIsNone(app._pending_snapshot)
+        self.assertEqual(self._journals(), [])
+        
+        # A restart sees the same labels
+        self.assertEqual(self._app().ground_truth, snapshot)
+    
+    def test_get_next_unlabeled_wraps_around(self):
+        with open(self.ground_truth_file, 'w') as f:
+            json.dump({'c0': _label('done'), 'c2': _label('done')}, f)
+        app = self._app()
+        
+        self.assertEqual(app.get_next_unlabeled(), 'c1')
+        self.assertEqual(app.get_next_unlabeled('c1'), 'c3')
+        self.assertEqual(app.get_next_unlabeled('c3'), 'c4')
+        self.assertEqual(app.get_next_unlabeled('c4'), 'c1')  # Wraps past the end
+        self.assertEqual(app.get_next_unlabeled('unknown'), 'c1')
+        
+        app.save_label('c1', 'm')
+        self.assertEqual(app.get_next_unlabeled('c4'), 'c3')
+        
+        for comic_id in ('c3', 'c4'):
+            app.save_label(comic_id, 'm')
+        self.assertIsNone(app.get_next_unlabeled('c0'))
+        app.compact()
+    
+    def test_explanations_rewritten_on_disk(self):
+        app = self._app()
+        app.save_label('c1', 'm')
+        
+        # generate_explanations.py reruns: c0 is dropped and c5 is added
+        explanations = {f'c{i}': {'explanations': {'m': f'new text {i}'}} for i in range(1, 6)}
+        with open(self.explanations_file, 'w') as f:
+            json.dump(explanations, f)
+        
+        self.assertIsNone(app.get_comic_data('c0'))
+        self.assertFalse(app.save_label('c0', 'm'))
+        self.assertEqual(app.get_comic_data('c2')['explanations'], {'m': 'new text 2'})
+        self.assertEqual(app.get_position('c5'), 5)
+        self.assertEqual(app.get_next_unlabeled('c1'), 'c2')
+        self.assertEqual(app.get_progress()['total'], 5)
+        
+        self.assertTrue(app.save_label('c5', 'm'))
+        self.assertEqual(app.ground_truth['c5']['explanation'], 'new text 5')
+        self.assertEqual(app.get_next_unlabeled('c4'), 'c2')
+        app.compact()
+
+if __name__ == '__main__':
+    unittest.main()
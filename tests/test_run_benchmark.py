@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for resuming an interrupted benchmark run from its journal.
+Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from run_benchmark import BenchmarkRunner
+
+def _score(reasoning: str = 'fine') -> dict:
+    return {'accuracy_score': 4, 'completeness_score': 4, 'insight_score': 4,
+            'clarity_score': 4, 'overall_score': 4, 'reasoning': reasoning}
+
+def _result(comic_id: str, explanations: dict, scores: dict) -> dict:
+    return {'comic_id': comic_id, 'explanations': explanations, 'scores': scores}
+
+class LoadJournalTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.runner = BenchmarkRunner(details_json=os.path.join(self._tmp.name, 'benchmark_details.json'))
+    
+    def _write_journal(self, *results, tail: bytes = b''):
+        with open(self.runner.journal_file, 'wb') as f:
+            for result in results:
+                f.write(json.dumps(result).encode('utf-8') + b'\n')
+            f.write(tail)
+    
+    def test_missing_journal(self):
+        self.assertEqual(self.runner._load_journal(['a']), {})
+    
+    def test_reuses_complete_results_trimmed_to_requested_models(self):
+        self._write_journal(
+            _result('c0', {'a': 'x', 'b': 'y'}, {'a': _score(), 'b': _score()}),
+            tail=b'{"comic_id": "c1", "expl',  # Torn by the interruption
+        )
+        
+        completed = self.runner._load_journal(['a'])
+        
+        self.assertEqual(list(completed), ['c0'])
+        self.assertEqual(completed['c0']['explanations'], {'a': 'x'})
+        self.assertEqual(completed['c0']['scores'], {'a': _score()})
+    
+    def test_skips_results_missing_a_requested_model(self):
+        self._write_journal(_result('c0', {'a': 'x'}, {'a': _score()}))
+        
+        self.assertEqual(self.runner._load_journal(['a', 'b']), {})
+    
+    def test_failed_models_are_retried(self):
+        self._write_journal(
+            _result('c0', {'a': '[Error: timed out]'}, {'a': _score()}),
+            _result('c1', {'a': 'x'}, {'a': _score('Error: judge returned no JSON')}),
+            _result('c2', {'a': 'x', 'b': '[Error: rate limited]'}, {'a': _score(), 'b': _score()}),
+        )
+        
+        # Only a failure in one of the requested models forces a rerun
+        self.assertEqual(list(self.runner._load_journal(['a'])), ['c2'])
+        self.assertEqual(self.runner._load_journal(['a', 'b']), {})
+
+if __name__ == '__main__':
+    unittest.main()